@@ -4,11 +4,50 @@ from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify
 from models.users import User
+from utils.auth_cache import auth_user_cache
 import jwt
 
 # 🔐 move this to env later
 SECRET_KEY = "secret"
 
+# Columns routes read from current_user
+IDENTITY_FIELDS = ("id", "user_id", "email", "role", "status")
+
+
+class AuthUser:
+    """
+    Identity of the authenticated user, passed to routes by @auth
+
+    Built from the per-process identity cache, so most requests do not touch
+    the users table. Attribute changes are not persisted; call load() for
+    the live User row when a route needs to modify it.
+    """
+
+    __slots__ = IDENTITY_FIELDS
+
+    def __init__(self, fields):
+        for name in IDENTITY_FIELDS:
+            setattr(self, name, fields[name])
+
+    def load(self):
+        """Return the User ORM object for this identity"""
+        return User.query.get(self.id)
+
+    def __repr__(self):
+        return f"<AuthUser {self.email} - {self.status}>"
+
+
+def get_auth_user(user_id):
+    """Return the AuthUser for `user_id` through the identity cache, or None"""
+    fields = auth_user_cache.get(user_id)
+    if fields is None:
+        user = User.query.get(user_id)
+        if not user:
+            return None
+        fields = {name: getattr(user, name) for name in IDENTITY_FIELDS}
+        auth_user_cache.set(user_id, fields)
+    return AuthUser(fields)
+
 
 def auth(f):
     @wraps(f)
@@ -37,7 +76,7 @@ def auth(f):
 
             # 5️⃣ Get user
             user_id = int(payload.get("sub"))
-            user = User.query.get(user_id)
+            user = get_auth_user(user_id)
 
             if not user:
                 return jsonify({"message": "User not found"}), 401
@@ -0,0 +1,16 @@
+from server import app
+from models.order_items import OrderItem
+
+def backfill_order_items():
+    with app.app_context():
+        try:
+            print("Writing order_items for orders that have none...")
+            written = OrderItem.backfill(
+                progress=lambda last_id, lines: print(f"  up to order {last_id}: {lines} lines written")
+            )
+            print(f"Backfill finished, {written} order lines written.")
+        except Exception as e:
+            print(f"Error backfilling order items: {e}")
+
+if __name__ == "__main__":
+    backfill_order_items()
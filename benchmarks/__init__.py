@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Standalone benchmark scripts, run from the repository root: python -m benchmarks.<name>
@@ -0,0 +1,40 @@
+# benchmarks/bench_app.py
+import importlib
+import os
+import tempfile
+from flask import Flask
+from db import db, ensure_indexes
+from utils.json_provider import FastJSONProvider
+from utils.product_search import ensure_search_index
+
+
+def create_bench_app(routes=(), database_uri=None):
+    """
+    Build an app wired like server.py against a throwaway SQLite database
+
+    Args:
+        routes: route module names under routes/ to register
+        database_uri: override the temporary SQLite file
+
+    Returns:
+        Flask: the app, with tables created
+    """
+    if database_uri is None:
+        handle, path = tempfile.mkstemp(prefix="mapmarket-bench-", suffix=".db")
+        os.close(handle)
+        database_uri = f"sqlite:///{path}"
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
+    db.init_app(app)
+
+    with app.app_context():
+        from models import signup, users, products, orders, wishlists, reviews, cart, billing, payment_details, email_otp, order_timeline, qr_payment, product_facets, id_counters, rating_summary, stock_reservation, order_stats, order_items
+        db.create_all()
+        ensure_indexes()
+        ensure_search_index(db.engine)
+        for name in routes:
+            importlib.import_module(f"routes.{name}")
+
+    return app
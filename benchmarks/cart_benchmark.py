@@ -0,0 +1,98 @@
+# benchmarks/cart_benchmark.py
+"""
+Cart read path: lazy product loads against the joined load_cart()
+
+    python -m benchmarks.cart_benchmark [lines]
+
+Fails if load_cart() issues more than one SQL statement for an uncached
+cart, or any for a cached one, so the eager load and the priced-cart cache
+cannot silently regress.
+"""
+import sys
+import time
+from datetime import datetime
+from sqlalchemy import event, text
+from benchmarks.bench_app import create_bench_app
+from db import db
+from models.cart import Cart
+from utils.cart_cache import cart_cache
+
+USER_ID = 1
+
+
+def seed(lines):
+    connection = db.session.connection()
+    connection.execute(text(
+        "INSERT INTO users (id, user_id, email, password, role, status) "
+        "VALUES (:id, 'BENCH', 'bench@example.com', '-', 'customer', 'active')"
+    ), {"id": USER_ID})
+    connection.execute(text(
+        "INSERT INTO products (seller_id, seller_name, product_id, title, category, price, stock, image_filename, created_at) "
+        "VALUES (1, 'bench', :product_id, :title, 'maps', 499, 50, '[\"map.png\"]', :created_at)"
+    ), [{"product_id": f"PRD-{n:03d}", "title": f"Map {n}", "created_at": datetime.utcnow()} for n in range(1, lines + 1)])
+    connection.execute(text(
+        "INSERT INTO cart (user_id, product_id, title, price, qty, stock, total, created_at) "
+        "VALUES (:user_id, :product_id, 'Map', 499, 2, 50, 0, :created_at)"
+    ), [{"user_id": USER_ID, "product_id": f"PRD-{n:03d}", "created_at": datetime.utcnow()} for n in range(1, lines + 1)])
+    db.session.commit()
+
+
+def count_statements(fn):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        fn()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    return len(statements)
+
+
+def timed(fn, repeat=50, warm=False):
+    total = 0.0
+    for _ in range(repeat):
+        db.session.expire_all()
+        if not warm:
+            cart_cache.clear()
+        start = time.perf_counter()
+        fn()
+        total += time.perf_counter() - start
+    return total / repeat * 1000
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    app = create_bench_app(routes=("carts",))
+    from routes.carts import get_cart_item_response, load_cart
+
+    with app.app_context():
+        seed(lines)
+
+        def lazy():
+            # What get_cart did before: one product query per line
+            return [get_cart_item_response(item) for item in Cart.query.filter_by(user_id=USER_ID).all()]
+
+        def joined():
+            return load_cart(USER_ID)
+
+        db.session.expire_all()
+        lazy_queries = count_statements(lazy)
+        db.session.expire_all()
+        cart_cache.clear()
+        joined_queries = count_statements(joined)
+        assert joined_queries == 1, f"load_cart issued {joined_queries} queries for {lines} lines"
+        cached_queries = count_statements(joined)
+        assert cached_queries == 0, f"cached load_cart issued {cached_queries} queries"
+
+        print(f"{lines} cart lines")
+        print(f"{'':<8}{'queries':>9}{'ms':>10}")
+        print(f"{'lazy':<8}{lazy_queries:>9}{timed(lazy):>10.2f}")
+        print(f"{'joined':<8}{joined_queries:>9}{timed(joined):>10.2f}")
+        print(f"{'cached':<8}{cached_queries:>9}{timed(joined, warm=True):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/json_benchmark.py
+"""
+Encoder micro-benchmark on Product, Order and Cart payloads
+
+    python -m benchmarks.json_benchmark
+
+"old" converts every Numeric/DateTime field the way the to_dict() methods
+used to (float()/isoformat()) and encodes with the stdlib json module.
+"new" hands the raw to_dict() output to FastJSONProvider.
+"""
+import json
+import timeit
+from datetime import datetime
+from decimal import Decimal
+from flask import Flask
+from db import db
+from models import signup, users, products, orders, wishlists, reviews, cart, billing, payment_details, email_otp, order_timeline, qr_payment, product_facets, id_counters, rating_summary
+from models.cart import Cart
+from models.orders import Order
+from models.products import Product
+from utils.json_provider import FastJSONProvider, orjson
+
+
+def legacy_convert(value):
+    """What the previous to_dict() implementations did field by field"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {key: legacy_convert(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [legacy_convert(item) for item in value]
+    return value
+
+
+def sample_payloads():
+    now = datetime.utcnow()
+    products = [
+        Product(
+            id=n, product_id=f"PRD-{n:03d}", seller_id=1, seller_name="Atlas Prints",
+            title=f"Vintage World Map {n}", description="Hand restored 1890 world map " * 8,
+            category="maps", price=Decimal("1499.00"), discount=Decimal("10.00"),
+            discounted_price=Decimal("1349.10"), tax=Decimal("242.84"), shipping_cost=Decimal("40.00"),
+            shipping_weight=Decimal("0.75"), features=["Framed", "Matte"], stock=12,
+            material=["Paper", "Canvas"], size=["A3", "A2"], print_quality="Giclee", finish="Matte",
+            care_instructions="Keep away from sunlight", image_filename=[f"map-{n}.jpg"], created_at=now
+        )
+        for n in range(1, 25)
+    ]
+    orders = [
+        Order(
+            id=n, order_number=f"MAP-{n:08d}", user_id=1, items=[{"product_id": "PRD-001", "qty": 2}],
+            total_amount=Decimal("2998.00"), payment_method="razorpay", payment_status="completed",
+            order_status="delivered", order_date=now, confirmed_at=now, shipped_at=now, delivered_at=now
+        )
+        for n in range(1, 25)
+    ]
+    carts = []
+    for n, product in enumerate(products[:10], start=1):
+        item = Cart(
+            id=n, user_id=1, product_id=product.product_id, title=product.title, price=product.price,
+            qty=2, total=Decimal("2698.20"), created_at=now, image_filename=product.image_filename
+        )
+        item.product = product
+        carts.append(item)
+
+    return {
+        "product": {"status": "success", "data": [p.to_dict() for p in products]},
+        "order": {"status": "success", "orders": [o.to_dict() for o in orders]},
+        "cart": [c.to_dict() for c in carts],
+    }
+
+
+def main():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    provider = FastJSONProvider(app)
+
+    with app.app_context():
+        payloads = sample_payloads()
+
+    print(f"orjson available: {orjson is not None}")
+    print(f"{'payload':<10}{'old (us)':>12}{'new (us)':>12}{'speedup':>10}")
+    for name, payload in payloads.items():
+        old = timeit.timeit(lambda: json.dumps(legacy_convert(payload), sort_keys=True), number=2000) / 2000 * 1e6
+        new = timeit.timeit(lambda: provider.dumps(payload), number=2000) / 2000 * 1e6
+        assert json.loads(provider.dumps(payload)) == json.loads(json.dumps(legacy_convert(payload)))
+        print(f"{name:<10}{old:>12.1f}{new:>12.1f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/login_benchmark.py
+"""
+Login throughput with inline hashing against the hashing pool
+
+    python -m benchmarks.login_benchmark [threads] [logins_per_thread]
+
+Runs concurrent POST /api/login calls while one more thread keeps calling
+a cheap route (GET /api/products/filters), once with hashing in the request
+thread and once through the process pool. Reports logins per second and
+the latency the cheap route sees while logins are running.
+"""
+import statistics
+import sys
+import threading
+import time
+from benchmarks.bench_app import create_bench_app
+from db import db
+from models.signup import Signup
+from models.users import User
+from utils.password_hasher import PasswordHasherBusy, password_hasher
+
+USER_COUNT = 50
+
+
+def seed():
+    password_hash = password_hasher.hash("bench-password")
+    for n in range(USER_COUNT):
+        identity = {"user_id": f"USRBENCH{n:03d}", "email": f"bench{n}@example.com"}
+        db.session.add(Signup(name=f"Bench {n}", phone=f"900000{n:04d}", password_hash=password_hash, **identity))
+        db.session.add(User(password=password_hash, **identity))
+    db.session.commit()
+
+
+def run(app, threads, per_thread):
+    statuses = []
+    cheap_latencies = []
+    done = threading.Event()
+
+    def login_worker(n):
+        client = app.test_client()
+        for i in range(per_thread):
+            response = client.post("/api/login", json={
+                "email": f"bench{(n * per_thread + i) % USER_COUNT}@example.com",
+                "password": "bench-password"
+            })
+            statuses.append(response.status_code)
+
+    def cheap_worker():
+        client = app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get("/api/products/filters")
+            cheap_latencies.append((time.perf_counter() - start) * 1000)
+
+    workers = [threading.Thread(target=login_worker, args=(n,)) for n in range(threads)]
+    observer = threading.Thread(target=cheap_worker)
+    observer.start()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    observer.join()
+
+    ok = statuses.count(200)
+    cheap_latencies.sort()
+    return {
+        "logins_per_s": ok / elapsed,
+        "rejected": statuses.count(503),
+        "cheap_p50": statistics.median(cheap_latencies),
+        "cheap_p95": cheap_latencies[int(len(cheap_latencies) * 0.95) - 1],
+    }
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    app = create_bench_app(routes=("main",))
+    with app.app_context():
+        seed()
+
+    print(f"{threads} threads x {per_thread} logins, method {password_hasher.method}, "
+          f"{password_hasher.workers} hashing processes")
+    print(f"{'':<10}{'logins/s':>10}{'503s':>7}{'filters p50 (ms)':>18}{'filters p95 (ms)':>18}")
+
+    pool_workers = password_hasher.workers
+    for label, workers in (("inline", 0), ("pool", pool_workers)):
+        password_hasher.workers = workers
+        try:
+            result = run(app, threads, per_thread)
+        except PasswordHasherBusy as e:
+            print(f"{label:<10}{e}")
+            continue
+        print(f"{label:<10}{result['logins_per_s']:>10.1f}{result['rejected']:>7}"
+              f"{result['cheap_p50']:>18.2f}{result['cheap_p95']:>18.2f}")
+
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/oauth_benchmark.py
+"""
+OAuth token verification against a local stub provider
+
+    python -m benchmarks.oauth_benchmark [calls]
+
+Starts benchmarks.oauth_stub, points oauth.py at it and times
+verify_google_token for opaque access tokens (userinfo round trip, then
+cache hits) and for ID tokens (verified offline against the JWKS keys).
+Also reports how many requests actually reached the provider.
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+from benchmarks.oauth_stub import StubGoogleProvider
+
+stub = StubGoogleProvider(client_id="bench-client.apps.googleusercontent.com").start()
+os.environ.update(stub.environ())
+
+from flask import Flask  # noqa: E402
+import oauth  # noqa: E402
+
+
+def timed(fn, calls):
+    # oauth.py logs every userinfo response; keep it out of the table
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(calls):
+            assert fn()
+        return (time.perf_counter() - start) / calls * 1000
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    app = Flask(__name__)
+
+    with app.app_context():
+        def uncached(token):
+            def verify():
+                oauth.verified_token_cache.clear()
+                return oauth.verify_google_token(token)
+            return verify
+
+        access_token = stub.issue_access_token()
+        id_token = stub.issue_id_token()
+
+        print(f"{calls} verifications each")
+        print(f"{'':<28}{'ms/call':>10}")
+        print(f"{'access token, no cache':<28}{timed(uncached(access_token), calls):>10.3f}")
+        print(f"{'access token, cached':<28}{timed(lambda: oauth.verify_google_token(access_token), calls):>10.3f}")
+        print(f"{'ID token, offline':<28}{timed(uncached(id_token), calls):>10.3f}")
+        print(f"{'ID token, cached':<28}{timed(lambda: oauth.verify_google_token(id_token), calls):>10.3f}")
+
+        # The code exchange primes the cache, so the callback's verify is free
+        before = stub.hits["/userinfo"]
+        with contextlib.redirect_stdout(io.StringIO()):
+            exchanged = oauth.exchange_code_for_token("stub-code")
+        assert oauth.verify_google_token(exchanged)["email"] == stub.email
+        print(f"userinfo calls after code exchange + verify: {stub.hits['/userinfo'] - before}")
+
+    print(f"provider requests: {dict(stub.hits)}")
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/oauth_stub.py
+"""
+Local stand-in for Google's OAuth endpoints
+
+    stub = StubGoogleProvider(client_id="bench-client").start()
+    os.environ.update(stub.environ())   # before oauth.py is imported
+
+Serves /token, /userinfo and /certs on 127.0.0.1 with a throwaway RSA key,
+issues ID tokens signed with it and counts every request it answers.
+"""
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+ISSUER = "https://accounts.google.com"
+
+
+class StubGoogleProvider:
+    def __init__(self, client_id, email="stub.user@example.com", name="Stub User"):
+        self.client_id = client_id
+        self.email = email
+        self.name = name
+        self.kid = uuid.uuid4().hex
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.hits = Counter()
+        self.access_tokens = {}
+        self._server = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def environ(self):
+        """Environment variables that point oauth.py at this stub"""
+        return {
+            "GOOGLE_CLIENT_ID": self.client_id,
+            "GOOGLE_TOKEN_URL": f"{self.base_url}/token",
+            "GOOGLE_USERINFO_URL": f"{self.base_url}/userinfo",
+            "GOOGLE_JWKS_URL": f"{self.base_url}/certs",
+        }
+
+    def issue_id_token(self, lifetime=3600):
+        now = int(time.time())
+        claims = {
+            "iss": ISSUER, "aud": self.client_id, "sub": "stub-123",
+            "email": self.email, "name": self.name, "iat": now, "exp": now + lifetime
+        }
+        return jwt.encode(claims, self.private_key, algorithm="RS256", headers={"kid": self.kid})
+
+    def issue_access_token(self):
+        token = f"ya29.stub-{uuid.uuid4().hex}"
+        self.access_tokens[token] = {"sub": "stub-123", "email": self.email, "name": self.name}
+        return token
+
+    def jwks(self):
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(self.private_key.public_key()))
+        jwk.update({"kid": self.kid, "alg": "RS256", "use": "sig"})
+        return {"keys": [jwk]}
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            wbufsize = 64 * 1024  # one write per response, avoids Nagle stalls on keep-alive
+
+            def _send(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                stub.hits[self.path] += 1
+                if self.path == "/certs":
+                    return self._send(200, stub.jwks())
+                if self.path == "/userinfo":
+                    token = self.headers.get("Authorization", "").replace("Bearer ", "")
+                    info = stub.access_tokens.get(token)
+                    return self._send(200, info) if info else self._send(401, {"error": "invalid_token"})
+                self._send(404, {"error": "not_found"})
+
+            def do_POST(self):
+                stub.hits[self.path] += 1
+                length = int(self.headers.get("Content-Length", 0))
+                form = parse_qs(self.rfile.read(length).decode())
+                if self.path == "/token" and form.get("code"):
+                    return self._send(200, {
+                        "access_token": stub.issue_access_token(),
+                        "id_token": stub.issue_id_token(),
+                        "expires_in": 3599,
+                        "token_type": "Bearer"
+                    })
+                self._send(400, {"error": "invalid_request"})
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
@@ -0,0 +1,114 @@
+# benchmarks/reservation_benchmark.py
+"""
+Many concurrent buyers on one SKU
+
+    python -m benchmarks.reservation_benchmark [buyers] [stock] [database_uri]
+
+Every buyer holds one unit for its own cart line at the same moment, once
+with the old read-check-write on Product.stock and once with
+StockReservation.hold(). Reports holds granted, units oversold and
+throughput. Pass a PostgreSQL URI to see real row-level contention;
+the default is a temporary SQLite file.
+"""
+import sys
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import text
+from benchmarks.bench_app import create_bench_app
+from db import db
+from models.cart import Cart
+from models.products import Product
+from models.stock_reservation import InsufficientStock, StockReservation
+
+PRODUCT_ID = "PRD-001"
+
+
+def reset(buyers, stock):
+    db.session.execute(text("DELETE FROM stock_reservations"))
+    db.session.execute(text("DELETE FROM cart"))
+    db.session.execute(text("DELETE FROM products"))
+    db.session.execute(text(
+        "INSERT INTO products (seller_id, seller_name, product_id, title, category, price, stock, created_at) "
+        "VALUES (1, 'bench', :product_id, 'Hot map', 'maps', 499, :stock, :created_at)"
+    ), {"product_id": PRODUCT_ID, "stock": stock, "created_at": datetime.utcnow()})
+    db.session.execute(text(
+        "INSERT INTO cart (id, user_id, product_id, title, price, qty, stock, total, created_at) "
+        "VALUES (:id, :id, :product_id, 'Hot map', 499, 1, 0, 0, :created_at)"
+    ), [{"id": n, "product_id": PRODUCT_ID, "created_at": datetime.utcnow()} for n in range(1, buyers + 1)])
+    db.session.commit()
+
+
+def read_check_write(cart_item):
+    """What update_cart_item used to do"""
+    product = Product.query.filter_by(product_id=cart_item.product_id).first()
+    if product.stock < 1:
+        raise InsufficientStock(cart_item.product_id, 1)
+    product.stock -= 1
+
+
+def reserve(cart_item):
+    StockReservation.hold(cart_item, 1)
+
+
+def run(app, buyers, stock, strategy):
+    with app.app_context():
+        reset(buyers, stock)
+
+    granted, refused, failed = [], [], []
+    start_line = threading.Barrier(buyers)
+
+    def buyer(cart_id):
+        start_line.wait()
+        with app.app_context():
+            try:
+                cart_item = db.session.get(Cart, cart_id)
+                strategy(cart_item)
+                db.session.commit()
+                granted.append(cart_id)
+            except InsufficientStock:
+                db.session.rollback()
+                refused.append(cart_id)
+            except Exception:
+                db.session.rollback()
+                failed.append(cart_id)
+
+    threads = [threading.Thread(target=buyer, args=(n,)) for n in range(1, buyers + 1)]
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    with app.app_context():
+        final_stock = db.session.execute(
+            text("SELECT stock FROM products WHERE product_id = :pid"), {"pid": PRODUCT_ID}
+        ).scalar()
+
+    return {
+        "granted": len(granted),
+        "refused": len(refused),
+        "errors": len(failed),
+        "oversold": max(0, len(granted) - stock),
+        "final_stock": final_stock,
+        "per_s": buyers / elapsed
+    }
+
+
+def main():
+    buyers = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    stock = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    database_uri = sys.argv[3] if len(sys.argv) > 3 else None
+    app = create_bench_app(database_uri=database_uri)
+
+    print(f"{buyers} buyers, {stock} units in stock")
+    print(f"{'':<18}{'granted':>9}{'refused':>9}{'errors':>8}{'oversold':>10}{'stock':>7}{'buyers/s':>10}")
+    for label, strategy in (("read-check-write", read_check_write), ("reservation", reserve)):
+        result = run(app, buyers, stock, strategy)
+        print(f"{label:<18}{result['granted']:>9}{result['refused']:>9}{result['errors']:>8}"
+              f"{result['oversold']:>10}{result['final_stock']:>7}{result['per_s']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
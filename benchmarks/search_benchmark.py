@@ -0,0 +1,100 @@
+# benchmarks/search_benchmark.py
+"""
+Full-text search against a seeded catalog
+
+    python -m benchmarks.search_benchmark [product_count]
+
+Compares the indexed /api/products/search path with what clients do today:
+download every product and filter in memory.
+"""
+import random
+import sys
+import time
+from datetime import datetime
+from sqlalchemy import text
+from benchmarks.bench_app import create_bench_app
+from db import db
+from utils.product_search import rebuild_search_index
+
+WORDS = [
+    "vintage", "world", "map", "atlas", "topographic", "nautical", "chart", "city",
+    "street", "poster", "print", "canvas", "linen", "antique", "mountain", "river",
+    "coastline", "satellite", "relief", "europe", "asia", "india", "subway", "star",
+]
+CATEGORIES = ["maps", "prints", "posters", "globes", "charts"]
+MATERIALS = ["Paper", "Canvas", "Vinyl", "Linen", "Metal"]
+QUERIES = ["vintage map", "nautical chart", "india", "canvas poster", "topographic relief europe"]
+
+
+def seed(product_count):
+    rng = random.Random(42)
+    connection = db.session.connection()
+    connection.execute(text(
+        "INSERT INTO users (id, user_id, email, password, role, status) "
+        "VALUES (1, 'BENCH', 'bench@example.com', '-', 'admin', 'active')"
+    ))
+
+    batch = []
+    for n in range(1, product_count + 1):
+        batch.append({
+            "seller_id": 1,
+            "seller_name": "bench",
+            "product_id": f"PRD-{n:03d}",
+            "title": " ".join(rng.sample(WORDS, 4)).title(),
+            "description": " ".join(rng.choices(WORDS, k=30)),
+            "category": rng.choice(CATEGORIES),
+            "price": rng.randint(100, 10000),
+            "stock": rng.randint(0, 50),
+            "features": f'["{rng.choice(WORDS)}", "{rng.choice(WORDS)}"]',
+            "material": f'["{rng.choice(MATERIALS)}"]',
+            "created_at": datetime.utcnow(),
+        })
+        if len(batch) == 5000:
+            _insert(connection, batch)
+            batch = []
+    _insert(connection, batch)
+    rebuild_search_index(connection)
+    db.session.commit()
+
+
+def _insert(connection, batch):
+    if batch:
+        connection.execute(text(
+            "INSERT INTO products (seller_id, seller_name, product_id, title, description, category, "
+            "price, stock, features, material, created_at) VALUES (:seller_id, :seller_name, :product_id, "
+            ":title, :description, :category, :price, :stock, :features, :material, :created_at)"
+        ), batch)
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    product_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    app = create_bench_app(routes=("main",))
+    client = app.test_client()
+
+    with app.app_context():
+        start = time.perf_counter()
+        seed(product_count)
+        print(f"Seeded and indexed {product_count} products in {time.perf_counter() - start:.1f}s")
+
+    def client_side_filter(query):
+        words = query.lower().split()
+        rows = db.session.execute(text("SELECT title, description FROM products")).all()
+        return [r for r in rows if all(w in f"{r[0]} {r[1]}".lower() for w in words)][:24]
+
+    print(f"{'query':<28}{'indexed (ms)':>14}{'full scan (ms)':>16}")
+    for query in QUERIES:
+        indexed = timed(lambda: client.get("/api/products/search", query_string={"q": query}), 20)
+        with app.app_context():
+            scanned = timed(lambda: client_side_filter(query), 3)
+        print(f"{query:<28}{indexed:>14.2f}{scanned:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
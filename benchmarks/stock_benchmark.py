@@ -0,0 +1,69 @@
+# benchmarks/stock_benchmark.py
+"""
+Per-item stock calls against one bulk call
+
+    python -m benchmarks.stock_benchmark [items_per_page]
+
+Times what the cart page does today (one GET /api/products/<id>/stock per
+line) against a single GET /api/products/stock?ids=.... Stock is not
+cached, so both read the products table on every call.
+"""
+import sys
+import time
+from datetime import datetime
+from sqlalchemy import text
+from benchmarks.bench_app import create_bench_app
+from db import db
+
+PRODUCT_COUNT = 5000
+
+
+def seed():
+    connection = db.session.connection()
+    connection.execute(text(
+        "INSERT INTO users (id, user_id, email, password, role, status) "
+        "VALUES (1, 'BENCH', 'bench@example.com', '-', 'admin', 'active')"
+    ))
+    connection.execute(text(
+        "INSERT INTO products (seller_id, seller_name, product_id, title, category, price, stock, created_at) "
+        "VALUES (1, 'bench', :product_id, :title, 'maps', 499, :stock, :created_at)"
+    ), [
+        {"product_id": f"PRD-{n:03d}", "title": f"Map {n}", "stock": n % 40, "created_at": datetime.utcnow()}
+        for n in range(1, PRODUCT_COUNT + 1)
+    ])
+    db.session.commit()
+
+
+def timed(fn, repeat=20):
+    total = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        total += time.perf_counter() - start
+    return total / repeat * 1000
+
+
+def main():
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    app = create_bench_app(routes=("main",))
+    client = app.test_client()
+    with app.app_context():
+        seed()
+
+    ids = [f"PRD-{n:03d}" for n in range(1, PRODUCT_COUNT + 1, PRODUCT_COUNT // items)][:items]
+
+    def per_item():
+        for product_id in ids:
+            assert client.get(f"/api/products/{product_id}/stock").status_code == 200
+
+    def batch():
+        response = client.get("/api/products/stock", query_string={"ids": ",".join(ids)})
+        assert len(response.get_json()["stock"]) == len(ids)
+
+    print(f"{items} products per page")
+    print(f"{'per-item (ms)':>16}{'batch (ms)':>14}")
+    print(f"{timed(per_item):>16.2f}{timed(batch):>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,3 +2,10 @@ from flask_sqlalchemy import SQLAlchemy
 
 # Initialize SQLAlchemy instance
 db = SQLAlchemy()
+
+
+def ensure_indexes():
+    """Create indexes declared on models that db.create_all() skips for tables that already exist"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
@@ -0,0 +1,30 @@
+import argparse
+from server import app
+from utils.product_import import ProductImporter
+
+def import_products(path, file_format, seller_id, seller_name, batch_size):
+    with app.app_context():
+        def show_progress(report):
+            print(f"  {report['processed']} rows read, {report['inserted']} inserted, {report['failed']} failed")
+
+        importer = ProductImporter(seller_id, seller_name, batch_size=batch_size, progress=show_progress)
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            report = importer.run(stream, file_format)
+
+        print(f"Import finished: {report['inserted']} of {report['processed']} rows inserted.")
+        for error in report["errors"]:
+            print(f"  row {error['row']}: {error['error']}")
+        if report["errors_truncated"]:
+            print(f"  ... {report['failed'] - len(report['errors'])} more errors not shown")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import products from a CSV or JSONL file")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="defaults to the file extension")
+    parser.add_argument("--seller-id", type=int, required=True, help="used when a row has no seller_id")
+    parser.add_argument("--seller-name", required=True, help="used when a row has no seller_name")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    import_products(args.path, args.format or args.path.rsplit(".", 1)[-1].lower(),
+                    args.seller_id, args.seller_name, args.batch_size)
@@ -33,7 +33,7 @@ class BillingInfo(db.Model):
             "state": self.state,
             "zip_code": self.zip_code,
             "country": self.country,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
             "is_primary": self.is_primary
         }
\ No newline at end of file
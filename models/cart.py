@@ -1,6 +1,7 @@
 # models/cart.py
 from datetime import datetime
 from db import db
+from utils.image_pipeline import variant_urls
 
 class Cart(db.Model):
     __tablename__ = "cart"
@@ -64,16 +65,17 @@ class Cart(db.Model):
             "product_id": product.product_id if product else self.product_id,
             "title": product.title if product else self.title,
             "category": product.category if product else None,
-            "price": float(product.price) if product else 0,
-            "discount": float(product.discount or 0) if product else 0,
-            "discounted_price": float(product.discounted_price or product.price or 0) if product else 0,
+            "price": product.price if product else 0,
+            "discount": (product.discount or 0) if product else 0,
+            "discounted_price": (product.discounted_price or product.price or 0) if product else 0,
             "stock": product.stock if product else self.stock,
             "size": self.size or (product.size if product else None),
             "qty": self.qty,
-            "shipping_cost": float(product.shipping_cost or 0) if product else 0,
-            "tax": float(product.tax or 0) if product else 0,
-            "total": float(self.total),
+            "shipping_cost": (product.shipping_cost or 0) if product else 0,
+            "tax": (product.tax or 0) if product else 0,
+            "total": self.total,
             "image_filename": self.get_primary_image() or (product.image_filename if product else None),
             "previewUrl": image_url,
-            "created_at": self.created_at.isoformat(),
+            "image_variants": variant_urls(self.get_primary_image() or (product.image_filename if product else None)),
+            "created_at": self.created_at,
         }
\ No newline at end of file
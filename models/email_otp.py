@@ -57,8 +57,8 @@ class EmailOTP(db.Model):
             "id": self.id,
             "email": self.email,
             "purpose": self.purpose,
-            "expires_at": self.expires_at.isoformat(),
+            "expires_at": self.expires_at,
             "verified": self.verified,
-            "verified_at": self.verified_at.isoformat() if self.verified_at else None,
-            "created_at": self.created_at.isoformat()
+            "verified_at": self.verified_at,
+            "created_at": self.created_at
         }
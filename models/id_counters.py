@@ -0,0 +1,9 @@
+# models/id_counters.py
+from db import db
+
+class IdCounter(db.Model):
+    """Next free number of a public id series (e.g. product_id), handed out in blocks by utils/id_allocator.py"""
+    __tablename__ = "id_counters"
+
+    name = db.Column(db.String(50), primary_key=True)
+    next_value = db.Column(db.BigInteger, nullable=False)
@@ -0,0 +1,171 @@
+# models/order_items.py
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import func, insert, or_, select
+from db import db
+from models.orders import Order
+from models.products import Product
+from models.order_stats import NON_SPEND_STATUSES
+
+
+class OrderItem(db.Model):
+    """
+    One line of an order, written alongside the Order.items JSON
+
+    product_id is products.id, the key reviews use. Lines whose product
+    cannot be resolved stay only in the JSON.
+    """
+    __tablename__ = "order_items"
+    __table_args__ = (
+        # Purchase checks and per-product sales
+        db.Index("ix_order_items_product_order", "product_id", "order_id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey("orders.id"), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey("products.id"), nullable=False)
+    size = db.Column(db.String(50), nullable=True)
+    qty = db.Column(db.Integer, nullable=False)
+    unit_price = db.Column(db.Numeric(10, 2), nullable=False)
+
+    @staticmethod
+    def _resolve_products(raw_ids):
+        """
+        Map the product ids found in order JSON to products.id
+
+        Items carry either the numeric id or the public PRD- id; all of
+        them are resolved with one query.
+        """
+        numeric, public = set(), set()
+        for raw in raw_ids:
+            if isinstance(raw, bool) or raw is None:
+                continue
+            if isinstance(raw, int) or (isinstance(raw, str) and raw.isdigit()):
+                numeric.add(int(raw))
+            elif isinstance(raw, str):
+                public.add(raw)
+        if not numeric and not public:
+            return {}
+
+        rows = db.session.execute(
+            select(Product.id, Product.product_id)
+            .where(or_(Product.id.in_(numeric), Product.product_id.in_(public)))
+        )
+        resolved = {}
+        for product_pk, public_id in rows:
+            if product_pk in numeric:
+                resolved[product_pk] = product_pk
+                resolved[str(product_pk)] = product_pk
+            if public_id in public:
+                resolved[public_id] = product_pk
+        return resolved
+
+    @staticmethod
+    def rows_for_orders(orders):
+        """order_items rows (dicts) for the JSON items of several orders"""
+        resolved = OrderItem._resolve_products(
+            item.get("product_id") for order in orders for item in (order.items or []) if isinstance(item, dict)
+        )
+
+        rows = []
+        for order in orders:
+            for item in order.items or []:
+                if not isinstance(item, dict):
+                    continue
+                product_id = resolved.get(item.get("product_id"))
+                if product_id is None:
+                    continue
+                try:
+                    qty = int(item.get("quantity", item.get("qty", 1)))
+                    unit_price = Decimal(str(item.get("price", 0))).quantize(Decimal("0.01"))
+                except (TypeError, ValueError, InvalidOperation):
+                    continue
+                rows.append({
+                    "order_id": order.id,
+                    "product_id": product_id,
+                    "size": item.get("size"),
+                    "qty": qty,
+                    "unit_price": unit_price
+                })
+        return rows
+
+    @staticmethod
+    def write_for_order(order):
+        """Insert the lines of a flushed order in the caller's transaction and return them; the caller commits"""
+        rows = OrderItem.rows_for_orders([order])
+        if rows:
+            db.session.execute(insert(OrderItem.__table__), rows)
+        return rows
+
+    @staticmethod
+    def purchased_product_ids(order):
+        """products.id values bought in `order`, from order_items or the JSON for orders not backfilled"""
+        product_ids = set(db.session.scalars(select(OrderItem.product_id).where(OrderItem.order_id == order.id)))
+        if product_ids or not order.items:
+            return product_ids
+        return {row["product_id"] for row in OrderItem.rows_for_orders([order])}
+
+    @staticmethod
+    def sales_by_product(since=None, until=None, limit=50):
+        """
+        Units sold and revenue per product over orders placed in [since, until),
+        best sellers first; cancelled and returned orders are left out
+
+        Returns:
+            list: [{"product_id", "title", "units", "revenue", "orders"}]
+        """
+        units = func.sum(OrderItem.qty)
+        query = (
+            select(
+                Product.product_id, Product.title, units,
+                func.sum(OrderItem.qty * OrderItem.unit_price),
+                func.count(func.distinct(OrderItem.order_id))
+            )
+            .join(Order, Order.id == OrderItem.order_id)
+            .join(Product, Product.id == OrderItem.product_id)
+            .where(Order.order_status.notin_(NON_SPEND_STATUSES))
+            .group_by(Product.id, Product.product_id, Product.title)
+            .order_by(units.desc(), Product.id)
+            .limit(limit)
+        )
+        if since is not None:
+            query = query.where(Order.order_date >= since)
+        if until is not None:
+            query = query.where(Order.order_date < until)
+
+        return [
+            {"product_id": product_id, "title": title, "units": sold, "revenue": revenue, "orders": order_count}
+            for product_id, title, sold, revenue, order_count in db.session.execute(query)
+        ]
+
+    @staticmethod
+    def backfill(batch_size=500, progress=None):
+        """
+        Write order_items for every order that has none, one batch of
+        orders per transaction
+
+        Returns:
+            int: number of lines written
+        """
+        written = 0
+        last_id = 0
+        while True:
+            has_lines = select(OrderItem.id).where(OrderItem.order_id == Order.id).exists()
+            orders = (
+                Order.query
+                .filter(Order.id > last_id, ~has_lines)
+                .order_by(Order.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not orders:
+                return written
+
+            rows = OrderItem.rows_for_orders(orders)
+            if rows:
+                db.session.execute(insert(OrderItem.__table__), rows)
+            db.session.commit()
+
+            written += len(rows)
+            last_id = orders[-1].id
+            if progress:
+                progress(last_id, written)
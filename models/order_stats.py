@@ -0,0 +1,210 @@
+# models/order_stats.py
+from datetime import datetime
+from decimal import Decimal
+from itertools import chain
+from sqlalchemy import case, event, func, insert, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from db import db
+from models.orders import Order
+
+# Orders in these states are not money the customer has spent
+NON_SPEND_STATUSES = ("cancelled", "returned")
+ZERO = Decimal("0")
+
+
+def _spend(status, amount):
+    if status in NON_SPEND_STATUSES or amount is None:
+        return ZERO
+    return Decimal(str(amount))
+
+
+class UserOrderStatusCount(db.Model):
+    """Number of a user's orders currently in each order_status"""
+    __tablename__ = "user_order_status_counts"
+
+    user_id = db.Column(db.Integer, primary_key=True)
+    order_status = db.Column(db.String(20), primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class UserOrderStats(db.Model):
+    """Order count and lifetime spend per user, kept in step with Order writes"""
+    __tablename__ = "user_order_stats"
+
+    user_id = db.Column(db.Integer, primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    lifetime_spend = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @staticmethod
+    def for_user(user_id):
+        """
+        Counters of one user: {"count", "by_status", "lifetime_spend"}
+
+        Reads only the user's counter rows. A user without counters yet (not
+        backfilled) is aggregated from orders without writing anything.
+        """
+        stats = db.session.get(UserOrderStats, user_id)
+        if stats is None:
+            stats_row, status_rows = UserOrderStats._grouped_rows([user_id])
+            stats_row = stats_row.get(user_id, {"order_count": 0, "lifetime_spend": ZERO})
+            by_status = {row["order_status"]: row["order_count"] for row in status_rows}
+        else:
+            stats_row = {"order_count": stats.order_count, "lifetime_spend": stats.lifetime_spend}
+            by_status = {
+                status: count for status, count in
+                db.session.query(UserOrderStatusCount.order_status, UserOrderStatusCount.order_count)
+                .filter(UserOrderStatusCount.user_id == user_id, UserOrderStatusCount.order_count > 0)
+            }
+
+        return {
+            "count": stats_row["order_count"],
+            "by_status": by_status,
+            "lifetime_spend": stats_row["lifetime_spend"]
+        }
+
+    @staticmethod
+    def _grouped_rows(user_ids=None, connection=None):
+        """
+        GROUP BY over orders -> ({user_id: stats row dict}, [status count row dicts])
+        """
+        spend = func.sum(case((Order.order_status.in_(NON_SPEND_STATUSES), 0), else_=Order.total_amount))
+        query = select(Order.user_id, Order.order_status, func.count(Order.id), spend).group_by(Order.user_id, Order.order_status)
+        if user_ids is not None:
+            query = query.where(Order.user_id.in_(user_ids))
+
+        now = datetime.utcnow()
+        stats, status_counts = {}, []
+        for user_id, status, count, spent in (connection or db.session).execute(query):
+            row = stats.setdefault(user_id, {"user_id": user_id, "order_count": 0, "lifetime_spend": ZERO, "updated_at": now})
+            row["order_count"] += count
+            row["lifetime_spend"] += Decimal(str(spent or 0))
+            if status:
+                status_counts.append({"user_id": user_id, "order_status": status, "order_count": count})
+        return stats, status_counts
+
+    @staticmethod
+    def seed(connection, user_ids):
+        """
+        Build counters from the orders table for the users in `user_ids`
+        that have none yet
+
+        Runs before a flush writes any order, so the counters match the
+        orders already stored and every write of the flush is then applied
+        on top by record_change().
+        """
+        stats = UserOrderStats.__table__
+        missing = set(user_ids) - set(connection.scalars(select(stats.c.user_id).where(stats.c.user_id.in_(user_ids))))
+        if not missing:
+            return
+
+        stats_rows, status_rows = UserOrderStats._grouped_rows(missing, connection)
+        for user_id in missing:
+            try:
+                with connection.begin_nested():
+                    connection.execute(insert(stats).values(
+                        **stats_rows.get(user_id, {"user_id": user_id, "order_count": 0, "lifetime_spend": ZERO})
+                    ))
+                    user_status_rows = [row for row in status_rows if row["user_id"] == user_id]
+                    if user_status_rows:
+                        connection.execute(insert(UserOrderStatusCount.__table__), user_status_rows)
+            except IntegrityError:
+                # Another transaction built them first, from the same stored orders
+                pass
+
+    @staticmethod
+    def record_change(connection, user_id, old_status, new_status, old_amount, new_amount, count_delta):
+        """
+        Apply one order write in the flushing transaction: an insert has
+        count_delta 1 and no old values, a delete count_delta -1 and no new
+        values. The user's counters exist already, see seed().
+        """
+        stats = UserOrderStats.__table__
+        spend_delta = _spend(new_status, new_amount) - _spend(old_status, old_amount)
+        connection.execute(
+            update(stats)
+            .where(stats.c.user_id == user_id)
+            .values(
+                order_count=stats.c.order_count + count_delta,
+                lifetime_spend=stats.c.lifetime_spend + spend_delta,
+                updated_at=datetime.utcnow()
+            )
+        )
+
+        # The stats UPDATE above holds the user's row lock until commit, so
+        # status rows of one user are never inserted concurrently
+        if old_status != new_status:
+            UserOrderStats._bump(connection, user_id, old_status, -1)
+            UserOrderStats._bump(connection, user_id, new_status, 1)
+
+    @staticmethod
+    def _bump(connection, user_id, status, delta):
+        if not status:
+            return
+        counts = UserOrderStatusCount.__table__
+        updated = connection.execute(
+            update(counts)
+            .where(counts.c.user_id == user_id, counts.c.order_status == status)
+            .values(order_count=counts.c.order_count + delta)
+        )
+        if not updated.rowcount and delta > 0:
+            connection.execute(insert(counts).values(user_id=user_id, order_status=status, order_count=delta))
+
+    @staticmethod
+    def rebuild():
+        """Recompute every user's counters from the orders table; returns the number of users"""
+        db.session.execute(UserOrderStatusCount.__table__.delete())
+        db.session.execute(UserOrderStats.__table__.delete())
+
+        stats_rows, status_rows = UserOrderStats._grouped_rows()
+        if stats_rows:
+            db.session.execute(insert(UserOrderStats.__table__), list(stats_rows.values()))
+        if status_rows:
+            db.session.execute(insert(UserOrderStatusCount.__table__), status_rows)
+        db.session.commit()
+        return len(stats_rows)
+
+
+def _previous(target, attribute):
+    history = inspect(target).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, attribute)
+
+
+@event.listens_for(Session, "before_flush")
+def seed_order_counters(session, flush_context, instances):
+    # Seeding inside the per-order hooks would count the other orders of
+    # the same flush twice: by then all of their rows are already written
+    user_ids = {
+        obj.user_id for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, Order) and obj.user_id is not None
+    }
+    if user_ids:
+        UserOrderStats.seed(session.connection(), user_ids)
+
+
+@event.listens_for(Order, "after_insert")
+def count_new_order(mapper, connection, target):
+    UserOrderStats.record_change(
+        connection, target.user_id, None, target.order_status, None, target.total_amount, 1
+    )
+
+
+@event.listens_for(Order, "after_update")
+def count_order_change(mapper, connection, target):
+    old_status = _previous(target, "order_status")
+    old_amount = _previous(target, "total_amount")
+    if old_status == target.order_status and old_amount == target.total_amount:
+        return
+    UserOrderStats.record_change(
+        connection, target.user_id, old_status, target.order_status, old_amount, target.total_amount, 0
+    )
+
+
+@event.listens_for(Order, "after_delete")
+def count_deleted_order(mapper, connection, target):
+    UserOrderStats.record_change(
+        connection, target.user_id, target.order_status, None, target.total_amount, None, -1
+    )
@@ -29,7 +29,7 @@ class OrderTimeline(db.Model):
             "status": self.status,
             "description": self.description,
             "location": self.location,
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": self.timestamp,
             "updated_by": self.updated_by,
             "event_metadata": self.event_metadata
         }
@@ -5,6 +5,10 @@ from db import db
 
 class Order(db.Model):
     __tablename__ = 'orders'
+    __table_args__ = (
+        # Newest-first order history per user
+        db.Index("ix_orders_user_order_date", "user_id", "order_date", "id"),
+    )
 
     # INTERNAL ID (DO NOT EXPOSE)
     id = db.Column(db.Integer, primary_key=True)
@@ -64,7 +68,7 @@ class Order(db.Model):
             "user_id": self.user_id,
             "billing_info_id": self.billing_info_id,
             "items": self.items,
-            "total_amount": float(self.total_amount),
+            "total_amount": self.total_amount,
             "payment_method": self.payment_method,
             "payment_status": self.payment_status,
             "payment_reference": self.payment_reference,
@@ -73,17 +77,17 @@ class Order(db.Model):
             # Delivery Tracking
             "delivery_partner": self.delivery_partner,
             "tracking_number": self.tracking_number,
-            "estimated_delivery": self.estimated_delivery.isoformat() if self.estimated_delivery else None,
+            "estimated_delivery": self.estimated_delivery,
             
             # Timestamps
-            "order_date": self.order_date.isoformat(),
-            "confirmed_at": self.confirmed_at.isoformat() if self.confirmed_at else None,
-            "shipped_at": self.shipped_at.isoformat() if self.shipped_at else None,
-            "out_for_delivery_at": self.out_for_delivery_at.isoformat() if self.out_for_delivery_at else None,
-            "delivered_at": self.delivered_at.isoformat() if self.delivered_at else None,
+            "order_date": self.order_date,
+            "confirmed_at": self.confirmed_at,
+            "shipped_at": self.shipped_at,
+            "out_for_delivery_at": self.out_for_delivery_at,
+            "delivered_at": self.delivered_at,
             
             "cancel_reason": self.cancel_reason,
-            "cancelled_at": self.cancelled_at.isoformat() if self.cancelled_at else None,
+            "cancelled_at": self.cancelled_at,
             "billing_info": self.billing_info.to_dict() if self.billing_info else None
         }
         
@@ -52,6 +52,6 @@ class PaymentDetail(db.Model):
             "razorpay_payment_id": self.razorpay_payment_id,
             "stripe_payment_intent_id": self.stripe_payment_intent_id,
             "qr_payment_id": self.qr_payment_id,
-            "created_at": self.created_at.isoformat(),
-            "payment_verified_at": self.payment_verified_at.isoformat() if self.payment_verified_at else None
+            "created_at": self.created_at,
+            "payment_verified_at": self.payment_verified_at
         }
@@ -0,0 +1,187 @@
+# models/product_facets.py
+import json
+from decimal import Decimal
+from db import db
+from sqlalchemy import or_, text, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+# INSERT ... ON CONFLICT builders of the databases the app runs on
+UPSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
+def normalize_materials(material):
+    """Turn a Product.material value (list, JSON string or comma string) into a list of clean names"""
+    if not material:
+        return []
+
+    if isinstance(material, str):
+        try:
+            parsed = json.loads(material)
+        except ValueError:
+            parsed = material.split(',')
+        material = parsed if isinstance(parsed, list) else [parsed]
+
+    if not isinstance(material, list):
+        return []
+
+    names = []
+    for value in material:
+        if isinstance(value, str) and value.strip() and value.strip() not in names:
+            names.append(value.strip()[:255])
+    return names
+
+
+def product_facet_values(category, material):
+    """(kind, value) pairs a product contributes to the facet table"""
+    values = [("material", name) for name in normalize_materials(material)]
+    if category:
+        values.insert(0, ("category", category[:255]))
+    return values
+
+
+class ProductFacet(db.Model):
+    """
+    Distinct filter values with the number of products using them, plus
+    the catalog price bounds (kind="price", value="min"/"max").
+    Maintained by the Product write listeners in models/products.py.
+    """
+    __tablename__ = "product_facets"
+    __table_args__ = (
+        db.UniqueConstraint("kind", "value", name="uq_product_facets_kind_value"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # 'category', 'material', 'price'
+    value = db.Column(db.String(255), nullable=False)
+    product_count = db.Column(db.Integer, nullable=False, default=0)
+    amount = db.Column(db.Numeric(10, 2), nullable=True)  # only used by price bounds
+
+    @staticmethod
+    def _upsert(connection, rows, set_):
+        """INSERT rows, or apply `set_` (a function of the excluded row) to the existing (kind, value)"""
+        statement = UPSERTS[connection.dialect.name](ProductFacet.__table__)
+        connection.execute(
+            statement.on_conflict_do_update(index_elements=["kind", "value"], set_=set_(statement.excluded)),
+            rows
+        )
+
+    @staticmethod
+    def apply_changes(connection, added=(), removed=()):
+        """Adjust facet counts for (kind, value) pairs gained and lost by one write"""
+        deltas = {}
+        for pair in added:
+            deltas[pair] = deltas.get(pair, 0) + 1
+        for pair in removed:
+            deltas[pair] = deltas.get(pair, 0) - 1
+
+        # New values are upserted, so two products bringing the same new
+        # category at once both count instead of one failing its insert
+        table = ProductFacet.__table__
+        gained = [{"kind": kind, "value": value, "product_count": delta}
+                  for (kind, value), delta in deltas.items() if delta > 0]
+        if gained:
+            ProductFacet._upsert(
+                connection, gained,
+                lambda excluded: {"product_count": table.c.product_count + excluded.product_count}
+            )
+
+        lost = [{"kind": kind, "value": value, "delta": delta}
+                for (kind, value), delta in deltas.items() if delta < 0]
+        if lost:
+            connection.execute(
+                text("UPDATE product_facets SET product_count = product_count + :delta "
+                     "WHERE kind = :kind AND value = :value"),
+                lost
+            )
+            connection.execute(
+                text("DELETE FROM product_facets WHERE kind != 'price' AND product_count <= 0")
+            )
+
+    @staticmethod
+    def refresh_price_bounds(connection):
+        """Re-read min/max price; both are single index lookups on ix_products_price_id"""
+        low, high = connection.execute(
+            text("SELECT MIN(price), MAX(price) FROM products")
+        ).fetchone()
+
+        table = ProductFacet.__table__
+        ProductFacet._upsert(
+            connection,
+            [{"kind": "price", "value": "min", "product_count": 0, "amount": low},
+             {"kind": "price", "value": "max", "product_count": 0, "amount": high}],
+            lambda excluded: {"amount": excluded.amount}
+        )
+
+    @staticmethod
+    def update_price_bounds(connection, old_price=None, new_price=None):
+        """
+        Keep the price bounds right after one product's price appears
+        (new_price), disappears (old_price) or both
+
+        A new price only widens the bounds with conditional UPDATEs. The
+        bounds are rescanned only when the price that went away sat on one
+        of them, or when they have never been computed.
+        """
+        bounds = {
+            value: (Decimal(str(amount)) if amount is not None else None)
+            for value, amount in connection.execute(
+                text("SELECT value, amount FROM product_facets WHERE kind = 'price'")
+            )
+        }
+        if len(bounds) < 2 or (old_price is not None and Decimal(str(old_price)) in bounds.values()):
+            ProductFacet.refresh_price_bounds(connection)
+            return
+
+        if new_price is None:
+            return
+        table = ProductFacet.__table__
+        for bound, outside in (("min", table.c.amount > new_price), ("max", table.c.amount < new_price)):
+            connection.execute(
+                update(table)
+                .where(table.c.kind == "price", table.c.value == bound, or_(table.c.amount.is_(None), outside))
+                .values(amount=new_price)
+            )
+
+    @staticmethod
+    def rebuild():
+        """Recompute every facet from the products table (backfills, repairs)"""
+        connection = db.session.connection()
+        connection.execute(text("DELETE FROM product_facets"))
+
+        counts = {}
+        rows = connection.execution_options(yield_per=1000).execute(
+            text("SELECT category, material FROM products")
+        )
+        for category, material in rows:
+            for pair in product_facet_values(category, material):
+                counts[pair] = counts.get(pair, 0) + 1
+
+        if counts:
+            connection.execute(
+                text("INSERT INTO product_facets (kind, value, product_count) "
+                     "VALUES (:kind, :value, :product_count)"),
+                [{"kind": kind, "value": value, "product_count": count}
+                 for (kind, value), count in counts.items()]
+            )
+        ProductFacet.refresh_price_bounds(connection)
+        db.session.commit()
+        return len(counts)
+
+    @staticmethod
+    def snapshot():
+        """Return (categories, materials, min_price, max_price) from the facet table"""
+        categories, materials = [], []
+        min_price = max_price = None
+
+        for facet in ProductFacet.query.all():
+            if facet.kind == "category":
+                categories.append(facet.value)
+            elif facet.kind == "material":
+                materials.append(facet.value)
+            elif facet.value == "min":
+                min_price = facet.amount
+            elif facet.value == "max":
+                max_price = facet.amount
+
+        return sorted(categories), sorted(materials), min_price, max_price
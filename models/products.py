@@ -1,10 +1,22 @@
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import JSON
 from db import db
-from sqlalchemy import event, text
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, object_session
+from utils.catalog_cache import product_cache, invalidate_product
+from utils.id_allocator import product_id_allocator
+from utils.image_pipeline import variant_urls
+from models.product_facets import ProductFacet, product_facet_values
+from utils.product_search import SEARCH_FIELDS, index_products, remove_products, search_document
 
 class Product(db.Model):
     __tablename__ = "products"
+    __table_args__ = (
+        # Keyset pagination indexes for the catalog listing sorts
+        db.Index("ix_products_created_at_id", "created_at", "id"),
+        db.Index("ix_products_price_id", "price", "id"),
+        db.Index("ix_products_category_created_at", "category", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -50,34 +62,161 @@ class Product(db.Model):
             "title": self.title,
             "description": self.description,
             "category": self.category,
-            "price": float(self.price),
-            "tax": float(self.tax or 0),
-            "shipping_cost": float(self.shipping_cost or 0),
-            "discount": float(self.discount or 0),
-            "discounted_price": float(self.discounted_price or self.price),
+            "price": self.price,
+            "tax": self.tax or 0,
+            "shipping_cost": self.shipping_cost or 0,
+            "discount": self.discount or 0,
+            "discounted_price": self.discounted_price or self.price,
             "features": self.features,
             "stock": self.stock or 0,
             "material": self.material,
             "size": self.size,
             "print_quality": self.print_quality,
             "finish": self.finish,
-            "shipping_weight": float(self.shipping_weight or 0),
+            "shipping_weight": self.shipping_weight or 0,
             "care_instructions": self.care_instructions,
             "image_filename": self.image_filename,
-            "created_at": self.created_at.isoformat()
+            "image_variants": variant_urls(self.image_filename),
+            "created_at": self.created_at
         }
 
+    @staticmethod
+    def get_documents(product_ids):
+        """
+        Return serialized products for `product_ids` in the same order,
+        reading through the per-worker catalog cache. Misses are loaded
+        with a single IN query. Unknown ids are left out.
+
+        Stock is not cached: it moves with every cart hold, often through
+        Core UPDATEs and from other processes. Cached documents get their
+        stock from one indexed query.
+        """
+        documents = product_cache.get_many(product_ids)
+        if documents:
+            stock = Product.get_stock(list(documents))
+            documents = {pid: dict(document, stock=stock[pid]) for pid, document in documents.items() if pid in stock}
+
+        missing = [pid for pid in product_ids if pid not in documents]
+        if missing:
+            for product in Product.query.filter(Product.product_id.in_(missing)).all():
+                document = product.to_dict()
+                product_cache.set(product.product_id, {key: value for key, value in document.items() if key != "stock"})
+                documents[product.product_id] = document
+
+        return [documents[pid] for pid in product_ids if pid in documents]
+
+    @staticmethod
+    def get_document(product_id):
+        """Return one serialized product through the catalog cache, or None"""
+        documents = Product.get_documents([product_id])
+        return documents[0] if documents else None
+
+    @staticmethod
+    def get_stock(product_ids):
+        """Current stock of many products straight from the table: {product_id: stock}"""
+        if not product_ids:
+            return {}
+        rows = db.session.execute(
+            select(Product.product_id, Product.stock).where(Product.product_id.in_(product_ids))
+        )
+        return {product_id: stock or 0 for product_id, stock in rows}
+
 # ✅ Auto-generate product_id like PRD-001, PRD-002...
 @event.listens_for(Product, 'before_insert')
 def generate_product_id(mapper, connection, target):
-    last_product = connection.execute(
-        text("SELECT product_id FROM products ORDER BY id DESC LIMIT 1")
-    ).fetchone()
-    if last_product and last_product[0]:
-        last_num = int(last_product[0].split('-')[1])
-        target.product_id = f"PRD-{last_num + 1:03d}"
-    else:
-        target.product_id = "PRD-001"
+    if not target.product_id:
+        target.product_id = product_id_allocator.next_id(connection)
+
+
+PENDING_INVALIDATIONS = "invalidate_products"
+
+
+def invalidate_after_commit(session, product_ids):
+    """
+    Drop products from this worker's caches once `session` commits
+
+    Evicting during the flush would let a concurrent reader cache the old
+    row again before the commit makes the new one visible. Core UPDATEs
+    that bypass the mapper listeners (stock holds) call this directly.
+    """
+    if session is None:
+        for product_id in product_ids:
+            invalidate_product(product_id)
+        return
+    session.info.setdefault(PENDING_INVALIDATIONS, set()).update(product_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_committed_products(session):
+    for product_id in session.info.pop(PENDING_INVALIDATIONS, ()):
+        invalidate_product(product_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def forget_rolled_back_products(session):
+    session.info.pop(PENDING_INVALIDATIONS, None)
+
+
+# Keep the catalog cache coherent with writes made through the ORM
+@event.listens_for(Product, 'after_insert')
+@event.listens_for(Product, 'after_update')
+@event.listens_for(Product, 'after_delete')
+def invalidate_cached_product(mapper, connection, target):
+    invalidate_after_commit(object_session(target), [target.product_id])
+
+
+def _previous_value(state, attr):
+    """Value an attribute had before the current flush"""
+    history = state.attrs[attr].history
+    return history.deleted[0] if history.deleted else getattr(state.object, attr)
+
+
+# Keep the /api/products/filters facet table in step with product writes
+@event.listens_for(Product, 'after_insert')
+def add_product_facets(mapper, connection, target):
+    ProductFacet.apply_changes(connection, added=product_facet_values(target.category, target.material))
+    ProductFacet.update_price_bounds(connection, new_price=target.price)
+
+
+@event.listens_for(Product, 'after_update')
+def update_product_facets(mapper, connection, target):
+    state = inspect(target)
+    old = product_facet_values(_previous_value(state, 'category'), _previous_value(state, 'material'))
+    new = product_facet_values(target.category, target.material)
+    if old != new:
+        ProductFacet.apply_changes(
+            connection,
+            added=[pair for pair in new if pair not in old],
+            removed=[pair for pair in old if pair not in new]
+        )
+    if state.attrs.price.history.has_changes():
+        ProductFacet.update_price_bounds(connection, old_price=_previous_value(state, 'price'), new_price=target.price)
+
+
+@event.listens_for(Product, 'after_delete')
+def remove_product_facets(mapper, connection, target):
+    state = inspect(target)
+    ProductFacet.apply_changes(
+        connection,
+        removed=product_facet_values(_previous_value(state, 'category'), _previous_value(state, 'material'))
+    )
+    ProductFacet.update_price_bounds(connection, old_price=_previous_value(state, 'price'))
+
+
+# Keep the full-text search index in step with product writes
+@event.listens_for(Product, 'after_insert')
+def index_new_product(mapper, connection, target):
+    index_products(connection, [(target.id, search_document(target))])
+
+
+@event.listens_for(Product, 'after_update')
+def reindex_product(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in SEARCH_FIELDS):
+        index_products(connection, [(target.id, search_document(target))])
 
 
+@event.listens_for(Product, 'after_delete')
+def unindex_product(mapper, connection, target):
+    remove_products(connection, [target.id])
 
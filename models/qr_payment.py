@@ -74,14 +74,14 @@ class QRPayment(db.Model):
             "id": self.id,
             "qr_id": self.qr_id,
             "order_id": self.order_id,
-            "amount": float(self.amount),
+            "amount": self.amount,
             "currency": self.currency,
             "status": self.status,
             "transaction_id": self.transaction_id,
             "transaction_ref": self.transaction_ref,
-            "created_at": self.created_at.isoformat(),
-            "expires_at": self.expires_at.isoformat(),
-            "verified_at": self.verified_at.isoformat() if self.verified_at else None,
+            "created_at": self.created_at,
+            "expires_at": self.expires_at,
+            "verified_at": self.verified_at,
             "is_expired": self.is_expired()
         }
         
@@ -0,0 +1,123 @@
+# models/rating_summary.py
+from datetime import datetime
+from db import db
+from sqlalchemy import func, insert, select, update, case
+from sqlalchemy.exc import IntegrityError
+from models.reviews import Review
+
+RATING_VALUES = (1, 2, 3, 4, 5)
+
+
+class ProductRatingSummary(db.Model):
+    """Review count, rating sum and 1-5 histogram per product, kept in step with Review writes"""
+    __tablename__ = "product_rating_summary"
+
+    product_id = db.Column(db.Integer, db.ForeignKey("products.id"), primary_key=True)
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_1 = db.Column(db.Integer, nullable=False, default=0)
+    rating_2 = db.Column(db.Integer, nullable=False, default=0)
+    rating_3 = db.Column(db.Integer, nullable=False, default=0)
+    rating_4 = db.Column(db.Integer, nullable=False, default=0)
+    rating_5 = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "average_rating": round(self.rating_sum / self.review_count, 1) if self.review_count else 0,
+            "total_reviews": self.review_count,
+            "ratings_breakdown": {str(rate): getattr(self, f"rating_{rate}") for rate in RATING_VALUES}
+        }
+
+    @staticmethod
+    def empty_dict():
+        return {
+            "average_rating": 0,
+            "total_reviews": 0,
+            "ratings_breakdown": {str(rate): 0 for rate in RATING_VALUES}
+        }
+
+    @staticmethod
+    def record_rating(product_id, old_rate, new_rate):
+        """
+        Apply one review write (old_rate is None for a new review) in the
+        caller's transaction. Counters move with a single atomic UPDATE;
+        a product without a summary row gets one built from its reviews.
+        """
+        deltas = {"rating_sum": new_rate - (old_rate or 0)}
+        if old_rate is None:
+            deltas["review_count"] = 1
+        if old_rate != new_rate:
+            if old_rate is not None:
+                deltas[f"rating_{old_rate}"] = -1
+            deltas[f"rating_{new_rate}"] = 1
+
+        table = ProductRatingSummary.__table__
+        values = {column: table.c[column] + delta for column, delta in deltas.items() if delta}
+        values["updated_at"] = datetime.utcnow()
+        statement = update(table).where(table.c.product_id == product_id).values(**values)
+
+        if db.session.execute(statement).rowcount:
+            return
+
+        # No summary yet: build it from the reviews, including the one being written
+        db.session.flush()
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(table).values(**ProductRatingSummary._grouped_rows([product_id])[product_id]))
+        except IntegrityError:
+            # Another request created the row first; its counts do not include this review
+            db.session.execute(statement)
+
+    @staticmethod
+    def _grouped_rows(product_ids=None):
+        """One GROUP BY over reviews -> {product_id: summary row dict}"""
+        columns = [Review.product_id, func.count(Review.id), func.sum(Review.rates)]
+        columns += [func.sum(case((Review.rates == rate, 1), else_=0)) for rate in RATING_VALUES]
+        query = select(*columns).group_by(Review.product_id)
+        if product_ids is not None:
+            query = query.where(Review.product_id.in_(product_ids))
+
+        now = datetime.utcnow()
+        summaries = {}
+        for row in db.session.execute(query):
+            summary = {"product_id": row[0], "review_count": row[1], "rating_sum": row[2], "updated_at": now}
+            for rate, count in zip(RATING_VALUES, row[3:]):
+                summary[f"rating_{rate}"] = count
+            summaries[row[0]] = summary
+        return summaries
+
+    @staticmethod
+    def for_products(product_ids):
+        """
+        Rating aggregates for many products: {product_id: to_dict() output}
+
+        Reads the summary table with one IN query; products without a
+        summary row (not backfilled yet) are aggregated from reviews in a
+        single grouped query.
+        """
+        results = {
+            summary.product_id: summary.to_dict()
+            for summary in ProductRatingSummary.query.filter(ProductRatingSummary.product_id.in_(product_ids)).all()
+        }
+
+        missing = [product_id for product_id in product_ids if product_id not in results]
+        if missing:
+            grouped = ProductRatingSummary._grouped_rows(missing)
+            for product_id in missing:
+                results[product_id] = (
+                    ProductRatingSummary(**grouped[product_id]).to_dict()
+                    if product_id in grouped else ProductRatingSummary.empty_dict()
+                )
+        return results
+
+    @staticmethod
+    def rebuild():
+        """Recompute every summary from the reviews table; returns the number of products summarized"""
+        db.session.execute(ProductRatingSummary.__table__.delete())
+
+        summaries = list(ProductRatingSummary._grouped_rows().values())
+        if summaries:
+            db.session.execute(insert(ProductRatingSummary.__table__), summaries)
+        db.session.commit()
+        return len(summaries)
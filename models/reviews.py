@@ -3,6 +3,10 @@ from db import db
 
 class Review(db.Model):
     __tablename__ = "reviews"
+    __table_args__ = (
+        # Newest-first review pages per product
+        db.Index("ix_reviews_product_created_at", "product_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
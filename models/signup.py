@@ -1,17 +1,17 @@
 from datetime import datetime
 import uuid
 from db import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.password_hasher import password_hasher
 
 class Signup(db.Model):
     __tablename__ = "signup"
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.String(50), unique=True, nullable=False, default=lambda: f"USR{uuid.uuid4().hex[:8].upper()}")
-    name = db.Column(db.String(150), nullable=False)
+    name = db.Column(db.String(150), nullable=False, index=True)
     email = db.Column(db.String(150), unique=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
-    phone = db.Column(db.String(20), nullable=True)
+    phone = db.Column(db.String(20), nullable=True, index=True)
     role = db.Column(db.String(50), default="customer", nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -21,11 +21,35 @@ class Signup(db.Model):
     # wishlists = db.relationship("Wishlist", backref="users", lazy=True)
     # reviews = db.relationship("Review", backref="users", lazy=True)
 
+    @staticmethod
+    def find_with_user(identifier):
+        """
+        Resolve a login identifier (email, phone or name) to its signup row
+        and the matching users row in one query
+
+        Returns:
+            tuple: (Signup, User or None), or (None, None) when nothing matches
+        """
+        from models.users import User
+
+        if "@" in identifier:
+            match = Signup.email == identifier
+        elif identifier.isdigit():
+            match = Signup.phone == identifier
+        else:
+            match = Signup.name == identifier
+
+        row = db.session.query(Signup, User).outerjoin(User, User.email == Signup.email).filter(match).first()
+        return (row[0], row[1]) if row else (None, None)
+
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f"<User {self.user_id} - {self.email}>"
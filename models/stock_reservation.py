@@ -0,0 +1,204 @@
+# models/stock_reservation.py
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.exc import IntegrityError
+from db import db
+from models.products import Product, invalidate_after_commit
+
+# How long a cart line keeps its units before the sweeper hands them back
+STOCK_RESERVATION_TTL = timedelta(minutes=int(os.environ.get("STOCK_RESERVATION_TTL_MINUTES", "30")))
+
+
+class InsufficientStock(Exception):
+    """Not enough unreserved stock left to hold the requested quantity"""
+
+    def __init__(self, product_id, requested):
+        super().__init__(f"Insufficient stock for {product_id}")
+        self.product_id = product_id
+        self.requested = requested
+
+
+class StockReservation(db.Model):
+    """
+    Units of a product held by one cart line until `expires_at`
+
+    products.stock is the unreserved stock: holding takes units out of it
+    with a single conditional UPDATE, so concurrent carts can never take
+    more than is there and no row is locked longer than that statement.
+    cart_id is deliberately not a foreign key; a line that disappears
+    without releasing its hold is cleaned up by the sweeper at expiry.
+    """
+    __tablename__ = "stock_reservations"
+
+    id = db.Column(db.Integer, primary_key=True)
+    cart_id = db.Column(db.Integer, nullable=False, unique=True)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    product_id = db.Column(db.String(50), nullable=False, index=True)
+    quantity = db.Column(db.Integer, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @staticmethod
+    def take_stock(product_id, quantity):
+        """Atomically remove `quantity` units from products.stock; False when there are not enough"""
+        products = Product.__table__
+        result = db.session.execute(
+            update(products)
+            .where(products.c.product_id == product_id, products.c.stock >= quantity)
+            .values(stock=products.c.stock - quantity)
+        )
+        if result.rowcount != 1:
+            return False
+        invalidate_after_commit(db.session, [product_id])
+        return True
+
+    @staticmethod
+    def return_stock(product_id, quantity):
+        products = Product.__table__
+        db.session.execute(
+            update(products)
+            .where(products.c.product_id == product_id)
+            .values(stock=products.c.stock + quantity)
+        )
+        invalidate_after_commit(db.session, [product_id])
+
+    @staticmethod
+    def for_cart_items(cart_ids):
+        """Load and lock the holds of several cart lines at once, keyed by cart_id"""
+        if not cart_ids:
+            return {}
+        return {
+            reservation.cart_id: reservation
+            for reservation in StockReservation._locked().filter(StockReservation.cart_id.in_(cart_ids)).all()
+        }
+
+    @staticmethod
+    def _locked():
+        # Row locks until commit, so concurrent holds on one line apply their
+        # deltas one after the other; populate_existing refreshes rows the
+        # session already holds
+        return StockReservation.query.with_for_update().populate_existing()
+
+    @staticmethod
+    def _lookup(cart_item, reservations):
+        if reservations is None:
+            return StockReservation._locked().filter_by(cart_id=cart_item.id).first()
+        return reservations.get(cart_item.id)
+
+    @staticmethod
+    def _create(cart_item, quantity):
+        """Take the units and insert the line's first hold inside a savepoint"""
+        with db.session.begin_nested():
+            if not StockReservation.take_stock(cart_item.product_id, quantity):
+                raise InsufficientStock(cart_item.product_id, quantity)
+            reservation = StockReservation(
+                cart_id=cart_item.id,
+                user_id=cart_item.user_id,
+                product_id=cart_item.product_id,
+                quantity=quantity,
+                expires_at=datetime.utcnow() + STOCK_RESERVATION_TTL
+            )
+            db.session.add(reservation)
+        return reservation
+
+    @staticmethod
+    def hold(cart_item, quantity, reservations=None):
+        """
+        Make `cart_item` hold exactly `quantity` units and push its expiry out
+
+        Only the difference to what the line already holds touches
+        products.stock. Raises InsufficientStock, leaving stock untouched,
+        when the extra units are not available. The caller commits.
+        Batch callers pass the dict from for_cart_items() as `reservations`
+        to skip the per-line lookup; it is kept up to date.
+        """
+        reservation = StockReservation._lookup(cart_item, reservations)
+        if reservation is None:
+            try:
+                reservation = StockReservation._create(cart_item, quantity)
+            except IntegrityError:
+                # A concurrent first hold for this line committed first; the
+                # savepoint undid our stock take, so adjust its row instead
+                reservation = StockReservation._lookup(cart_item, None)
+            else:
+                if reservations is not None:
+                    reservations[cart_item.id] = reservation
+                return
+            if reservations is not None:
+                reservations[cart_item.id] = reservation
+
+        delta = quantity - reservation.quantity
+        if delta > 0 and not StockReservation.take_stock(cart_item.product_id, delta):
+            raise InsufficientStock(cart_item.product_id, quantity)
+        if delta < 0:
+            StockReservation.return_stock(cart_item.product_id, -delta)
+
+        reservation.quantity = quantity
+        reservation.expires_at = datetime.utcnow() + STOCK_RESERVATION_TTL
+
+    @staticmethod
+    def release(cart_item, reservations=None):
+        """Give back whatever `cart_item` holds; returns the number of units released"""
+        reservation = StockReservation._lookup(cart_item, reservations)
+        if not reservation:
+            return 0
+        StockReservation.return_stock(reservation.product_id, reservation.quantity)
+        db.session.delete(reservation)
+        if reservations is not None:
+            reservations.pop(cart_item.id, None)
+        return reservation.quantity
+
+    @staticmethod
+    def sell(cart_items):
+        """
+        Turn the holds of ordered cart lines into a sale: they are deleted
+        without returning their units, so products.stock stays decremented.
+        The caller removes the lines and commits.
+
+        Returns:
+            int: number of holds consumed
+        """
+        cart_ids = [cart_item.id for cart_item in cart_items]
+        if not cart_ids:
+            return 0
+        return db.session.execute(
+            delete(StockReservation).where(StockReservation.cart_id.in_(cart_ids))
+        ).rowcount
+
+    @staticmethod
+    def release_expired(now=None, batch_size=1000):
+        """
+        Delete one batch of expired holds and return their units, one
+        UPDATE per product. DELETE ... RETURNING makes each hold released
+        by exactly one sweeper even when several run at once. The caller
+        commits.
+
+        Returns:
+            dict: {product_id: units released}
+        """
+        now = now or datetime.utcnow()
+        expired_ids = select(StockReservation.id).where(StockReservation.expires_at <= now).limit(batch_size)
+        rows = db.session.execute(
+            delete(StockReservation)
+            # Checked again on the DELETE: a hold() may have pushed the expiry
+            # out after the subquery picked the row
+            .where(StockReservation.id.in_(expired_ids.scalar_subquery()), StockReservation.expires_at <= now)
+            .returning(StockReservation.product_id, StockReservation.quantity)
+        ).all()
+
+        released = defaultdict(int)
+        for product_id, quantity in rows:
+            released[product_id] += quantity
+
+        if released:
+            products = Product.__table__
+            db.session.execute(
+                update(products)
+                .where(products.c.product_id == bindparam("pid"))
+                .values(stock=products.c.stock + bindparam("released")),
+                [{"pid": product_id, "released": quantity} for product_id, quantity in released.items()]
+            )
+            invalidate_after_commit(db.session, released)
+        return dict(released)
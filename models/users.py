@@ -1,5 +1,7 @@
 from datetime import datetime
 from db import db
+from sqlalchemy import event
+from utils.auth_cache import invalidate_user
 
 class User(db.Model):
     __tablename__ = "users"
@@ -21,3 +23,10 @@ class User(db.Model):
 
     def __repr__(self):
         return f"<User {self.email} - {self.status}>"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def drop_cached_identity(mapper, connection, target):
+    """Keep the @auth identity cache in step with role/status/email changes"""
+    invalidate_user(target.id)
@@ -1,9 +1,15 @@
 # models/wishlist.py
 from datetime import datetime
 from db import db
+from models.rating_summary import ProductRatingSummary
+from utils.image_pipeline import variant_urls
 
 class Wishlist(db.Model):
     __tablename__ = "wishlist"
+    __table_args__ = (
+        # Newest-first wishlist pages per user
+        db.Index("ix_wishlist_user_created_at", "user_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -40,8 +46,18 @@ class Wishlist(db.Model):
             return None
         return f"http://127.0.0.1:5000/static/uploads/products/{primary_image}"
 
-    def to_dict(self):
+    def to_dict(self, rating=None):
+        """
+        Args:
+            rating: ProductRatingSummary.for_products() entry for the product;
+                looked up on its own when not given
+        """
         product = self.product
+        if rating is None:
+            rating = (
+                ProductRatingSummary.for_products([product.id])[product.id]
+                if product else ProductRatingSummary.empty_dict()
+            )
         
         # Get image URL - try from wishlist item first, then from product
         image_url = self.get_image_url()
@@ -59,16 +75,18 @@ class Wishlist(db.Model):
             "product_id": self.product_id,
             "title": product.title if product else None,
             "category": product.category if product else None,
-            "price": float(product.price) if product else 0,
-            "discount": float(product.discount or 0) if product else 0,
+            "price": product.price if product else 0,
+            "discount": (product.discount or 0) if product else 0,
             "discounted_price": (
-                float(product.discounted_price or product.price or 0)
+                product.discounted_price or product.price or 0
                 if product else 0
             ),
-            "reviews": product.reviews if product else 0,
+            "reviews": rating["total_reviews"],
+            "rating": rating["average_rating"],
             "stock": product.stock if product else 0,
             "size": product.size if product else None,
             "image_filename": self.get_primary_image() or (product.image_filename[0] if product and isinstance(product.image_filename, list) and len(product.image_filename) > 0 else (product.image_filename if product and isinstance(product.image_filename, str) else None)),
             "previewUrl": image_url,
-            "created_at": self.created_at.isoformat()
+            "image_variants": variant_urls(self.get_primary_image() or (product.image_filename if product else None)),
+            "created_at": self.created_at
         }
\ No newline at end of file
@@ -1,19 +1,113 @@
 # oauth.py
+import hashlib
 import os
+import time
+import jwt
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from flask import current_app, request, jsonify
 from functools import wraps
 import json
+from utils.ttl_cache import TTLCache
 
-GOOGLE_USERINFO = "https://www.googleapis.com/oauth2/v3/userinfo"
-GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
-GOOGLE_AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
+# Endpoints can be pointed at a local stub provider through the environment
+GOOGLE_USERINFO = os.environ.get("GOOGLE_USERINFO_URL", "https://www.googleapis.com/oauth2/v3/userinfo")
+GOOGLE_TOKEN_URL = os.environ.get("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+GOOGLE_AUTH_URL = os.environ.get("GOOGLE_AUTH_URL", "https://accounts.google.com/o/oauth2/v2/auth")
+GOOGLE_JWKS_URL = os.environ.get("GOOGLE_JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+GOOGLE_ISSUERS = os.environ.get("GOOGLE_ISSUERS", "https://accounts.google.com,accounts.google.com").split(",")
 
 # Google OAuth Configuration
 GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID", "")
 GOOGLE_CLIENT_SECRET = os.environ.get("GOOGLE_CLIENT_SECRET", "")
 GOOGLE_REDIRECT_URI = os.environ.get("GOOGLE_REDIRECT_URI", "http://localhost:3000/auth/callback")
 
+# (connect, read) seconds for every call to Google
+OAUTH_HTTP_TIMEOUT = (
+    float(os.environ.get("OAUTH_CONNECT_TIMEOUT", "3.05")),
+    float(os.environ.get("OAUTH_READ_TIMEOUT", "10"))
+)
+OAUTH_HTTP_POOL_SIZE = int(os.environ.get("OAUTH_HTTP_POOL_SIZE", "20"))
+
+
+def _build_session():
+    """Keep-alive session shared by all Google calls in this process"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=OAUTH_HTTP_POOL_SIZE,
+        # Only idempotent reads are retried; the token exchange is a POST
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+http = _build_session()
+
+# Verified user info keyed by sha256(token), so raw tokens are never kept in memory
+verified_token_cache = TTLCache(
+    maxsize=int(os.environ.get("OAUTH_TOKEN_CACHE_SIZE", "10000")),
+    ttl=int(os.environ.get("OAUTH_TOKEN_CACHE_TTL", "300"))
+)
+
+# Google's signing keys, refetched at most every JWKS_LIFESPAN seconds
+_jwks_client = jwt.PyJWKClient(
+    GOOGLE_JWKS_URL,
+    cache_keys=True,
+    lifespan=int(os.environ.get("GOOGLE_JWKS_LIFESPAN", "3600")),
+    timeout=OAUTH_HTTP_TIMEOUT[1]
+)
+
+
+def _token_key(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _cache_user_info(token, user_info, expires_at=None):
+    """Cache a verified identity, never beyond the token's own expiry"""
+    ttl = None
+    if expires_at:
+        ttl = min(verified_token_cache.ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+    verified_token_cache.set(_token_key(token), user_info, ttl=ttl)
+
+
+def verify_google_id_token(id_token):
+    """
+    Verify a Google ID token offline against the cached JWKS keys
+
+    Returns:
+        tuple: (user info dict, expiry timestamp), or (None, None) when invalid
+    """
+    try:
+        signing_key = _jwks_client.get_signing_key_from_jwt(id_token)
+        claims = jwt.decode(
+            id_token,
+            signing_key.key,
+            algorithms=["RS256"],
+            audience=GOOGLE_CLIENT_ID,
+            issuer=GOOGLE_ISSUERS,
+            options={"require": ["exp", "iss", "aud", "sub"]}
+        )
+    except jwt.PyJWTError as e:
+        print(f"[DEBUG] ID token rejected: {e}")
+        return None, None
+
+    if not claims.get("email"):
+        return None, None
+
+    return {
+        "email": claims["email"],
+        "name": claims.get("name"),
+        "provider_id": claims["sub"],
+        "picture": claims.get("picture"),
+        "provider": "google"
+    }, claims["exp"]
+
 def get_google_auth_url():
     """Generate Google OAuth URL for frontend"""
     scopes = [
@@ -45,14 +139,24 @@ def exchange_code_for_token(code):
             "redirect_uri": GOOGLE_REDIRECT_URI
         }
         
-        response = requests.post(GOOGLE_TOKEN_URL, data=payload)
+        response = http.post(GOOGLE_TOKEN_URL, data=payload, timeout=OAUTH_HTTP_TIMEOUT)
         data = response.json()
         
         if response.status_code != 200:
             print(f"Token exchange error: {data}")
             return None
-            
-        return data.get("access_token")
+
+        access_token = data.get("access_token")
+
+        # The ID token in the same response vouches for this access token,
+        # so the verify call that follows is answered from the cache
+        if access_token and data.get("id_token"):
+            user_info, expires_at = verify_google_id_token(data["id_token"])
+            if user_info:
+                expires_in = data.get("expires_in")
+                _cache_user_info(access_token, user_info, time.time() + expires_in if expires_in else expires_at)
+
+        return access_token
     except Exception as e:
         print(f"Token exchange exception: {e}")
         return None
@@ -77,12 +181,23 @@ def verify_google_token(access_token):
             user_key = access_token.replace("mock_", "")
             return mock_users.get(user_key, None)
         
+        cached = verified_token_cache.get(_token_key(access_token))
+        if cached is not None:
+            return cached
+
+        # ID tokens (JWTs) are verified locally; opaque access tokens need Google
+        if access_token.count(".") == 2:
+            user_info, expires_at = verify_google_id_token(access_token)
+            if user_info:
+                _cache_user_info(access_token, user_info, expires_at)
+            return user_info
+
         print(f"[DEBUG] Verifying Google token: {access_token[:20]}...")
         
-        response = requests.get(
+        response = http.get(
             GOOGLE_USERINFO,
             headers={"Authorization": f"Bearer {access_token}"},
-            timeout=10
+            timeout=OAUTH_HTTP_TIMEOUT
         )
         
         print(f"[DEBUG] Google response status: {response.status_code}")
@@ -94,13 +209,15 @@ def verify_google_token(access_token):
         data = response.json()
         print(f"[DEBUG] User info received: {json.dumps(data, indent=2)}")
         
-        return {
+        user_info = {
             "email": data.get("email"),
             "name": data.get("name"),
             "provider_id": data.get("sub"),
             "picture": data.get("picture"),
             "provider": "google"
         }
+        _cache_user_info(access_token, user_info)
+        return user_info
         
     except requests.exceptions.Timeout:
         print("[ERROR] Google API timeout")
@@ -0,0 +1,14 @@
+import argparse
+from utils.static_assets import STATIC_ROOT, precompress
+
+def precompress_static(root):
+    print(f"Writing precompressed siblings for {root}...")
+    written = precompress(root)
+    print(f"Precompression finished, {written} files written.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write .br/.gz siblings for the static build; run after each frontend build")
+    parser.add_argument("--root", default=STATIC_ROOT)
+    args = parser.parse_args()
+
+    precompress_static(args.root)
@@ -0,0 +1,18 @@
+import argparse
+from utils.image_pipeline import UPLOAD_DIR, process_directory
+
+def process_images(upload_dir, workers):
+    def show_progress(done, total, filename):
+        print(f"  [{done}/{total}] {filename}")
+
+    print(f"Building image variants in {upload_dir}...")
+    manifest = process_directory(upload_dir, workers=workers, progress=show_progress)
+    print(f"Image variants ready for {len(manifest)} images.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build thumbnail/card/detail variants for uploaded product images")
+    parser.add_argument("--upload-dir", default=UPLOAD_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="defaults to the number of CPUs")
+    args = parser.parse_args()
+
+    process_images(args.upload_dir, args.workers)
@@ -0,0 +1,14 @@
+from server import app
+from models.product_facets import ProductFacet
+
+def rebuild_facets():
+    with app.app_context():
+        try:
+            print("Rebuilding product facets from the products table...")
+            facet_count = ProductFacet.rebuild()
+            print(f"Product facets rebuilt: {facet_count} category/material values.")
+        except Exception as e:
+            print(f"Error rebuilding product facets: {e}")
+
+if __name__ == "__main__":
+    rebuild_facets()
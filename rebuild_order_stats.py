@@ -0,0 +1,14 @@
+from server import app
+from models.order_stats import UserOrderStats
+
+def rebuild_order_stats():
+    with app.app_context():
+        try:
+            print("Rebuilding per-user order counters from the orders table...")
+            user_count = UserOrderStats.rebuild()
+            print(f"Order counters rebuilt for {user_count} users.")
+        except Exception as e:
+            print(f"Error rebuilding order counters: {e}")
+
+if __name__ == "__main__":
+    rebuild_order_stats()
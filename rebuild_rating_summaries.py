@@ -0,0 +1,14 @@
+from server import app
+from models.rating_summary import ProductRatingSummary
+
+def rebuild_rating_summaries():
+    with app.app_context():
+        try:
+            print("Rebuilding product rating summaries from the reviews table...")
+            product_count = ProductRatingSummary.rebuild()
+            print(f"Rating summaries rebuilt for {product_count} products.")
+        except Exception as e:
+            print(f"Error rebuilding rating summaries: {e}")
+
+if __name__ == "__main__":
+    rebuild_rating_summaries()
@@ -0,0 +1,16 @@
+from server import app, db
+from utils.product_search import rebuild_search_index
+
+def rebuild_index():
+    with app.app_context():
+        try:
+            print("Rebuilding the product search index...")
+            indexed = rebuild_search_index(db.session.connection())
+            db.session.commit()
+            print(f"Search index rebuilt: {indexed} products indexed.")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error rebuilding search index: {e}")
+
+if __name__ == "__main__":
+    rebuild_index()
@@ -0,0 +1,27 @@
+import argparse
+from server import app, db
+from models.stock_reservation import StockReservation
+
+def release_expired_reservations(batch_size):
+    with app.app_context():
+        try:
+            print("Releasing expired stock reservations...")
+            products = units = 0
+            while True:
+                released = StockReservation.release_expired(batch_size=batch_size)
+                db.session.commit()
+                if not released:
+                    break
+                products += len(released)
+                units += sum(released.values())
+            print(f"Released {units} units across {products} product updates.")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error releasing reservations: {e}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Return stock held by expired cart reservations (run from cron)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    release_expired_reservations(args.batch_size)
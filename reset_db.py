@@ -1,15 +1,19 @@
 from server import app, db
 from sqlalchemy import text
+from utils.product_search import drop_search_index, ensure_search_index
 
 def reset_database():
     with app.app_context():
         try:
             print("WARNING: This will delete all data in the database!")
             print("Dropping all tables...")
+            # The search index is not in db.metadata and references products
+            drop_search_index(db.engine)
             db.drop_all()
             
             print("Creating all tables with new schema...")
             db.create_all()
+            ensure_search_index(db.engine)
             
             print("Database reset successfully! New schema applied.")
         except Exception as e:
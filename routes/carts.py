@@ -1,40 +1,83 @@
 # routes/cart.py
+from decimal import Decimal, ROUND_HALF_UP
+from operator import add, mul
 from flask import request, jsonify, current_app as app
+from sqlalchemy.orm import joinedload
 from models.cart import Cart
 from models.products import Product
+from models.stock_reservation import InsufficientStock, StockReservation
 from db import db
 from auth import auth
+from utils.cart_cache import cart_cache, invalidate_cart
+from utils.image_pipeline import PRODUCT_IMAGE_BASE_URL, primary_image, variant_urls
 
-TAX_RATE = 0.18
-FREE_SHIPPING_THRESHOLD = 800
-SHIPPING_COST = 40
+TAX_RATE = Decimal("0.18")
+FREE_SHIPPING_THRESHOLD = Decimal("800")
+SHIPPING_COST = Decimal("40")
+CENT = Decimal("0.01")
+ZERO = Decimal("0")
 
-def get_cart_item_response(item):
+def unit_price(item):
+    """Price one unit of a cart line is charged at: the live product price, else the copy on the line"""
+    product = item.product
+    if product:
+        return Decimal(product.discounted_price or product.price or 0)
+    return Decimal(item.price or 0)
+
+
+def price_cart(items):
+    """
+    Price a whole cart at once
+
+    Works column-wise over the unit prices and quantities of all lines in
+    Decimal. Tax is charged per line and summed. Shipping is charged once
+    per cart, waived when the subtotal reaches FREE_SHIPPING_THRESHOLD.
+
+    Returns:
+        tuple: (per-line {"subtotal", "tax", "total"} dicts in item order, summary dict)
+    """
+    prices = [unit_price(item) for item in items]
+    quantities = [item.qty for item in items]
+
+    line_subtotals = list(map(mul, prices, quantities))
+    line_taxes = [(value * TAX_RATE).quantize(CENT, ROUND_HALF_UP) for value in line_subtotals]
+    line_totals = list(map(add, line_subtotals, line_taxes))
+
+    subtotal = sum(line_subtotals, ZERO)
+    tax = sum(line_taxes, ZERO)
+    shipping = ZERO if not items or subtotal >= FREE_SHIPPING_THRESHOLD else SHIPPING_COST
+
+    lines = [
+        {"subtotal": line_subtotal, "tax": line_tax, "total": line_total}
+        for line_subtotal, line_tax, line_total in zip(line_subtotals, line_taxes, line_totals)
+    ]
+    summary = {
+        "line_count": len(items),
+        "item_count": sum(quantities),
+        "subtotal": subtotal.quantize(CENT, ROUND_HALF_UP),
+        "tax": tax,
+        "shipping_cost": shipping,
+        "grand_total": (subtotal + tax + shipping).quantize(CENT, ROUND_HALF_UP)
+    }
+    return lines, summary
+
+
+def store_line_pricing(item):
+    """Write a line's own subtotal tax and total onto the cart row; shipping is cart-level"""
+    (pricing,), _ = price_cart([item])
+    item.tax = pricing["tax"]
+    item.shipping_cost = ZERO
+    item.total = pricing["total"]
+    return pricing
+
+
+def get_cart_item_response(item, pricing=None):
     """Helper function to format cart item response consistently"""
     product = item.product
-    
-    # Get image URL
-    preview_url = None
-    image_filename = None
-    
-    if item.image_filename:
-        # Handle both array and string formats
-        if isinstance(item.image_filename, list) and len(item.image_filename) > 0:
-            primary_image = item.image_filename[0]
-            preview_url = f"http://127.0.0.1:5000/static/uploads/products/{primary_image}"
-            image_filename = primary_image
-        elif isinstance(item.image_filename, str):
-            preview_url = f"http://127.0.0.1:5000/static/uploads/products/{item.image_filename}"
-            image_filename = item.image_filename
-    elif product and product.image_filename:
-        # Fallback to product's image
-        if isinstance(product.image_filename, list) and len(product.image_filename) > 0:
-            primary_image = product.image_filename[0]
-            preview_url = f"http://127.0.0.1:5000/static/uploads/products/{primary_image}"
-            image_filename = primary_image
-        elif isinstance(product.image_filename, str):
-            preview_url = f"http://127.0.0.1:5000/static/uploads/products/{product.image_filename}"
-            image_filename = product.image_filename
+
+    # Cart rows keep a copy of the product's images; fall back to the product's own
+    image_filename = primary_image(item.image_filename) or (primary_image(product.image_filename) if product else None)
+    preview_url = f"{PRODUCT_IMAGE_BASE_URL}/{image_filename}" if image_filename else None
     
     return {
         "cart_id": item.id,
@@ -44,24 +87,65 @@ def get_cart_item_response(item):
         "category": product.category if product else None,
         "size": item.size,
         "qty": item.qty,
-        "price": float(product.discounted_price or product.price or 0) if product else float(item.price or 0),
+        "price": float(unit_price(item)),
         "discount": float(product.discount or 0) if product else float(item.discount or 0),
         "discounted_price": float(product.discounted_price or product.price or 0) if product else float(item.discounted_price or item.price or 0),
         "stock": int(product.stock or 0) if product else int(item.stock or 0),
-        "shipping_cost": float(item.shipping_cost or 0),
-        "tax": float(item.tax or 0),
-        "total": float(item.total or 0),
+        # Shipping is charged once per cart (see the summary); rows priced
+        # before that still carry a per-line figure, so it is not read back
+        "shipping_cost": 0.0,
+        "tax": float(pricing["tax"] if pricing else item.tax or 0),
+        "total": float(pricing["total"] if pricing else item.total or 0),
         "image_filename": image_filename,
         "previewUrl": preview_url,
+        "image_variants": variant_urls(image_filename),
         "created_at": item.created_at.isoformat() if item.created_at else None,
     }
 
+
+def load_cart(user_id):
+    """
+    Return a user's priced cart, from the per-user cache when it is unchanged
+
+    On a miss the lines and their products are loaded in one query and the
+    whole cart is priced by price_cart(). Cart mutations and product changes
+    drop the cached entry.
+
+    Returns:
+        tuple: (list of line dicts, summary dict)
+    """
+    cached = cart_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    # Taken before reading, so a concurrent invalidation keeps this read out of the cache
+    token = cart_cache.begin_load()
+    items = (
+        Cart.query.options(joinedload(Cart.product))
+        .filter_by(user_id=user_id)
+        .order_by(Cart.id)
+        .all()
+    )
+    line_pricing, summary = price_cart(items)
+    lines = [get_cart_item_response(item, pricing) for item, pricing in zip(items, line_pricing)]
+
+    priced_cart = (lines, summary)
+    cart_cache.set(user_id, priced_cart, {item.product_id for item in items}, token)
+    return priced_cart
+
+
 @app.route("/api/cart", methods=["GET"])
 @auth
 def get_cart(current_user):
-    cart_items = Cart.query.filter_by(user_id=current_user.id).all()
-    result = [get_cart_item_response(item) for item in cart_items]
-    return jsonify(result), 200
+    lines, _ = load_cart(current_user.id)
+    return jsonify(lines), 200
+
+@app.route("/api/cart/summary", methods=["GET"])
+@auth
+def get_cart_summary(current_user):
+    """Cart lines plus cart-level subtotal, tax, shipping and grand total"""
+    lines, summary = load_cart(current_user.id)
+    return jsonify({"status": "success", "items": lines, "summary": summary}), 200
 
 @app.route("/api/cart/<int:user_id>", methods=["GET"])
 @auth
@@ -70,10 +154,8 @@ def get_cart_by_user(current_user, user_id):
     if current_user.id != user_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    cart_items = Cart.query.filter_by(user_id=user_id).all()
-    result = [get_cart_item_response(item) for item in cart_items]
-    
-    return jsonify(result), 200
+    lines, _ = load_cart(user_id)
+    return jsonify(lines), 200
 
 # The rest of your routes remain the same...
 @app.route("/api/cart", methods=["POST"])
@@ -83,6 +165,8 @@ def add_to_cart(current_user):
     product_id = str(data.get("product_id"))
     size = data.get("size")
     qty = int(data.get("quantity", 1))
+    if qty < 1:
+        return jsonify({"error": "Quantity must be at least 1"}), 400
 
     product = Product.query.filter_by(product_id=product_id).first()
     if not product:
@@ -96,13 +180,21 @@ def add_to_cart(current_user):
     ).first()
 
     if existing_item:
+        try:
+            StockReservation.hold(existing_item, existing_item.qty + qty)
+        except InsufficientStock:
+            db.session.rollback()
+            return jsonify({"error": "Insufficient stock"}), 400
         existing_item.qty += qty
+        store_line_pricing(existing_item)
         db.session.commit()
+        invalidate_cart(current_user.id)
         return jsonify({"message": "Cart updated"}), 200
 
     # Create new cart item with product's image_filename
     new_item = Cart(
         user_id=current_user.id,
+        product=product,
         product_id=product.product_id,
         title=product.title,
         size=size,
@@ -112,13 +204,18 @@ def add_to_cart(current_user):
         qty=qty,
         stock=product.stock,
         image_filename=product.image_filename,  # This will be JSON array
-        shipping_cost=0,
-        tax=0,
-        total=0
     )
+    store_line_pricing(new_item)
 
     db.session.add(new_item)
+    db.session.flush()  # the hold is keyed by the new cart line's id
+    try:
+        StockReservation.hold(new_item, qty)
+    except InsufficientStock:
+        db.session.rollback()
+        return jsonify({"error": "Insufficient stock"}), 400
     db.session.commit()
+    invalidate_cart(current_user.id)
 
     return jsonify({"message": "Product added to cart"}), 201
 
@@ -133,12 +230,12 @@ def remove_from_cart(current_user, product_id):
     if not cart_item:
         return jsonify({"error": "Item not found in your cart"}), 404
 
-    product = Product.query.filter_by(product_id=product_id).first()
-    if product:
-        product.stock += cart_item.qty
+    # Only units this line actually holds go back to stock
+    StockReservation.release(cart_item)
 
     db.session.delete(cart_item)
     db.session.commit()
+    invalidate_cart(current_user.id)
 
     return jsonify({"message": "Removed from cart"}), 200
 
@@ -147,6 +244,8 @@ def remove_from_cart(current_user, product_id):
 def update_cart_item(current_user, product_id):
     data = request.get_json()
     new_qty = int(data.get("qty", 1))
+    if new_qty < 1:
+        return jsonify({"error": "Quantity must be at least 1"}), 400
 
     cart_item = Cart.query.filter_by(
         user_id=current_user.id,
@@ -156,33 +255,155 @@ def update_cart_item(current_user, product_id):
     if not cart_item:
         return jsonify({"error": "Item not found in your cart"}), 404
 
-    product = Product.query.filter_by(product_id=product_id).first()
-
-    old_qty = cart_item.qty
-    qty_diff = new_qty - old_qty
-
-    if qty_diff > 0:
-        if product.stock < qty_diff:
-            return jsonify({"error": "Insufficient stock"}), 400
-        product.stock -= qty_diff
-    else:
-        product.stock += abs(qty_diff)
-
-    price = float(product.discounted_price or product.price)
-    subtotal = price * new_qty
-    tax_amount = subtotal * TAX_RATE
-    shipping_cost = 0 if subtotal >= FREE_SHIPPING_THRESHOLD else SHIPPING_COST
-    total_price = subtotal + tax_amount + shipping_cost
+    try:
+        StockReservation.hold(cart_item, new_qty)
+    except InsufficientStock:
+        db.session.rollback()
+        return jsonify({"error": "Insufficient stock"}), 400
 
     cart_item.qty = new_qty
-    cart_item.tax = tax_amount
-    cart_item.shipping_cost = shipping_cost
-    cart_item.total = total_price
+    pricing = store_line_pricing(cart_item)
 
     db.session.commit()
+    invalidate_cart(current_user.id)
 
     return jsonify({
         "product_id": product_id,
         "qty": new_qty,
-        "total": total_price
-    }), 200
\ No newline at end of file
+        "total": pricing["total"]
+    }), 200
+
+MAX_CART_OPERATIONS = 100
+CART_OPERATIONS = ("add", "update", "remove")
+
+
+class CartOperationError(ValueError):
+    """One operation of a batch cannot be applied; the whole batch is rolled back"""
+
+    def __init__(self, index, message, status=400):
+        super().__init__(message)
+        self.index = index
+        self.status = status
+
+
+def _parse_operations(raw_operations):
+    """Validate a PATCH body up front so nothing is written for a malformed batch"""
+    if not isinstance(raw_operations, list) or not raw_operations:
+        raise CartOperationError(None, "operations must be a non-empty list")
+    if len(raw_operations) > MAX_CART_OPERATIONS:
+        raise CartOperationError(None, f"At most {MAX_CART_OPERATIONS} operations per request")
+
+    operations = []
+    for index, raw in enumerate(raw_operations):
+        if not isinstance(raw, dict) or raw.get("op") not in CART_OPERATIONS:
+            raise CartOperationError(index, f"op must be one of {', '.join(CART_OPERATIONS)}")
+        if not raw.get("product_id"):
+            raise CartOperationError(index, "product_id is required")
+
+        operation = {"op": raw["op"], "product_id": str(raw["product_id"]), "size": raw.get("size")}
+        if raw["op"] != "remove":
+            try:
+                operation["qty"] = int(raw.get("qty", raw.get("quantity", 1)))
+            except (TypeError, ValueError):
+                raise CartOperationError(index, "qty must be an integer")
+            if operation["qty"] < 1:
+                raise CartOperationError(index, "Quantity must be at least 1")
+        operations.append(operation)
+    return operations
+
+
+def apply_cart_operations(user_id, operations):
+    """
+    Apply validated add/update/remove operations to a user's cart in the
+    current transaction, with the products, cart lines (joined with their
+    products) and stock holds loaded up front in three queries. Products
+    whose stock moves are evicted from the caches by StockReservation once
+    the caller commits.
+    """
+    product_ids = {operation["product_id"] for operation in operations}
+    products = {product.product_id: product for product in Product.query.filter(Product.product_id.in_(product_ids)).all()}
+    # Pricing reads item.product, so the lines come with their products
+    lines = Cart.query.options(joinedload(Cart.product)).filter_by(user_id=user_id).order_by(Cart.id).all()
+    reservations = StockReservation.for_cart_items([line.id for line in lines])
+
+    def find_line(product_id, size=None, any_size=True):
+        for line in lines:
+            if line.product_id == product_id and (any_size or line.size == size):
+                return line
+        return None
+
+    for index, operation in enumerate(operations):
+        product_id = operation["product_id"]
+        try:
+            if operation["op"] == "add":
+                product = products.get(product_id)
+                if not product:
+                    raise CartOperationError(index, f"Product {product_id} not found", 404)
+                line = find_line(product_id, operation["size"], any_size=False)
+                if line:
+                    StockReservation.hold(line, line.qty + operation["qty"], reservations)
+                    line.qty += operation["qty"]
+                else:
+                    line = Cart(
+                        user_id=user_id,
+                        product=product,
+                        product_id=product.product_id,
+                        title=product.title,
+                        size=operation["size"],
+                        price=product.price,
+                        discount=product.discount,
+                        discounted_price=product.discounted_price,
+                        qty=operation["qty"],
+                        stock=product.stock,
+                        image_filename=product.image_filename,
+                    )
+                    store_line_pricing(line)
+                    db.session.add(line)
+                    db.session.flush()  # the hold is keyed by the new cart line's id
+                    StockReservation.hold(line, operation["qty"], reservations)
+                    lines.append(line)
+                store_line_pricing(line)
+
+            else:
+                line = find_line(product_id)
+                if not line:
+                    raise CartOperationError(index, f"Product {product_id} is not in your cart", 404)
+                if operation["op"] == "update":
+                    StockReservation.hold(line, operation["qty"], reservations)
+                    line.qty = operation["qty"]
+                    store_line_pricing(line)
+                else:
+                    StockReservation.release(line, reservations)
+                    db.session.delete(line)
+                    lines.remove(line)
+
+        except InsufficientStock:
+            raise CartOperationError(index, f"Insufficient stock for {product_id}")
+
+
+@app.route("/api/cart", methods=["PATCH"])
+@auth
+def patch_cart(current_user):
+    """
+    Apply several cart changes in one transaction
+
+    Body: {"operations": [{"op": "add", "product_id": ..., "qty": 2, "size": ...},
+                          {"op": "update", "product_id": ..., "qty": 1},
+                          {"op": "remove", "product_id": ...}]}
+    Operations run in order; if any fails none are applied. Responds with
+    the recomputed cart.
+    """
+    data = request.get_json(silent=True) or {}
+
+    try:
+        operations = _parse_operations(data.get("operations"))
+        apply_cart_operations(current_user.id, operations)
+        db.session.commit()
+    except CartOperationError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e), "operation": e.index}), e.status
+
+    invalidate_cart(current_user.id)
+
+    lines, summary = load_cart(current_user.id)
+    return jsonify({"status": "success", "items": lines, "summary": summary}), 200
@@ -4,97 +4,185 @@ from auth import auth
 from models.signup import Signup
 from models.users import User
 from models.products import Product
+from models.product_facets import ProductFacet
 from db import db
-from sqlalchemy import distinct
+from sqlalchemy.exc import IntegrityError
+from decimal import Decimal, InvalidOperation
+from utils.pagination import InvalidCursor, keyset_paginate, parse_limit
+from utils.catalog_cache import product_cache
+from utils.auth_cache import invalidate_user
+from utils.password_hasher import PasswordHasherBusy
+from utils.product_search import MAX_SEARCH_RESULTS, search_products
 from oauth import get_google_auth_url, exchange_code_for_token, verify_google_token
 
+# sort name -> (column, descending)
+PRODUCT_SORTS = {
+    "newest": (Product.created_at, True),
+    "oldest": (Product.created_at, False),
+    "price_asc": (Product.price, False),
+    "price_desc": (Product.price, True),
+}
+
+
 @app.route("/api/products", methods=["GET"])
 def get_all_products():
-    products = Product.query.all()
-    product_list = [product.to_dict() for product in products]
+    """
+    List products one page at a time
+
+    Query params: sort (newest|oldest|price_asc|price_desc), category
+    (comma separated), min_price, max_price, limit, cursor
+    """
+    sort = request.args.get("sort", "newest")
+    if sort not in PRODUCT_SORTS:
+        return jsonify({"status": "error", "message": f"Unsupported sort: {sort}"}), 400
+    sort_column, descending = PRODUCT_SORTS[sort]
+
+    # Only keys are read from the table; the documents come from the catalog cache
+    query = db.session.query(Product.id, Product.product_id, sort_column)
+
+    categories = [c.strip() for c in request.args.get("category", "").split(",") if c.strip()]
+    if categories:
+        query = query.filter(Product.category.in_(categories))
+
+    try:
+        min_price = request.args.get("min_price", type=Decimal)
+        max_price = request.args.get("max_price", type=Decimal)
+    except InvalidOperation:
+        return jsonify({"status": "error", "message": "Invalid price filter"}), 400
+    if min_price is not None:
+        query = query.filter(Product.price >= min_price)
+    if max_price is not None:
+        query = query.filter(Product.price <= max_price)
+
+    limit = parse_limit(request.args.get("limit"))
+    try:
+        rows, next_cursor = keyset_paginate(
+            query, sort, sort_column, Product.id,
+            descending=descending,
+            cursor=request.args.get("cursor"),
+            limit=limit
+        )
+    except InvalidCursor as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    product_list = Product.get_documents([row.product_id for row in rows])
 
     return jsonify({
         "status": "success",
         "count": len(product_list),
-        "data": product_list
+        "data": product_list,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
     }), 200
 
 
 
+@app.route("/api/products/search", methods=["GET"])
+def search_catalog():
+    """
+    Ranked full-text search over title, description, category, features and material
+
+    Query params: q, page (1-based), limit
+    """
+    query_text = request.args.get("q", "").strip()
+    if not query_text:
+        return jsonify({"status": "error", "message": "Search query 'q' is required"}), 400
+
+    limit = parse_limit(request.args.get("limit"))
+    page = max(request.args.get("page", 1, type=int), 1)
+    offset = (page - 1) * limit
+    if offset >= MAX_SEARCH_RESULTS:
+        return jsonify({"status": "error", "message": "Page is beyond the searchable range"}), 400
+
+    # One extra hit tells us whether a next page exists
+    product_ids = search_products(db.session.connection(), query_text, limit + 1, offset)
+    has_more = len(product_ids) > limit
+    product_list = Product.get_documents(product_ids[:limit])
+
+    return jsonify({
+        "status": "success",
+        "query": query_text,
+        "page": page,
+        "count": len(product_list),
+        "has_more": has_more,
+        "data": product_list
+    }), 200
+
+
 @app.route("/api/products/<string:product_id>", methods=["GET"])
 def get_product(product_id):
-    product = Product.query.filter_by(product_id=product_id).first()
+    product = Product.get_document(product_id)
     if not product:
         return jsonify({"status": "error", "message": "Product not found"}), 404
 
     return jsonify({
         "status": "success",
-        "data": product.to_dict()
+        "data": product
     }), 200
 
 
 @app.route("/api/products/<string:product_id>/stock", methods=["GET"])
 def get_product_stock(product_id):
-    product = Product.query.filter_by(product_id=product_id).first()
-    if not product:
+    stock = Product.get_stock([product_id])
+    if product_id not in stock:
         return jsonify({"status": "error", "message": "Product not found"}), 404
 
     return jsonify({
         "status": "success",
-        "product_id": product.product_id,
-        "stock": product.stock
+        "product_id": product_id,
+        "stock": stock[product_id]
+    }), 200
+
+
+# Upper bound on ids per bulk stock request
+MAX_STOCK_BATCH = 300
+
+
+@app.route("/api/products/stock", methods=["GET"])
+def get_products_stock():
+    """Stock for many products at once: ?ids=PRD-001,PRD-002,..."""
+    product_ids = list(dict.fromkeys(pid.strip() for pid in request.args.get("ids", "").split(",") if pid.strip()))
+    if not product_ids:
+        return jsonify({"status": "error", "message": "ids is required"}), 400
+    if len(product_ids) > MAX_STOCK_BATCH:
+        return jsonify({"status": "error", "message": f"At most {MAX_STOCK_BATCH} ids per request"}), 400
+
+    # Stock is never cached; one IN query on the unique product_id index
+    stock = Product.get_stock(product_ids)
+
+    return jsonify({
+        "status": "success",
+        "stock": stock,
+        "missing": [pid for pid in product_ids if pid not in stock]
+    }), 200
+
+
+@app.route("/api/products/cache-stats", methods=["GET"])
+@auth
+def get_product_cache_stats(current_user):
+    """Hit/miss counters of this worker's catalog cache, for sizing it"""
+    if current_user.role != 'admin':
+        return jsonify({"status": "error", "message": "Unauthorized"}), 403
+
+    return jsonify({
+        "status": "success",
+        "cache": product_cache.stats()
     }), 200
 
 
 @app.route("/api/products/filters", methods=["GET"])
 def get_product_filters():
-    """Get dynamic filter options from products"""
-    
-    # Get unique categories
-    categories = db.session.query(distinct(Product.category)).filter(Product.category.isnot(None)).all()
-    category_list = [cat[0] for cat in categories if cat[0]]
-    
-    # Get unique materials/formats
-    all_materials = set()
-    products = Product.query.all()
-    
-    for product in products:
-        if product.material:  # Changed from product.format to product.material
-            # Handle different material storage formats
-            if isinstance(product.material, list):
-                for material in product.material:
-                    if material:
-                        all_materials.add(material.strip())
-            elif isinstance(product.material, str):
-                # Try to parse as JSON
-                try:
-                    import json
-                    materials = json.loads(product.material)
-                    if isinstance(materials, list):
-                        for material in materials:
-                            if material:
-                                all_materials.add(material.strip())
-                except:
-                    # Treat as comma-separated string
-                    materials = product.material.split(',')
-                    for material in materials:
-                        if material.strip():
-                            all_materials.add(material.strip())
-    
-    material_list = sorted(list(all_materials))
-    
-    # Get price ranges
-    min_price = db.session.query(db.func.min(Product.price)).scalar() or 0
-    max_price = db.session.query(db.func.max(Product.price)).scalar() or 10000
-    
+    """Get dynamic filter options from the product facet table"""
+    categories, materials, min_price, max_price = ProductFacet.snapshot()
+
     return jsonify({
         "status": "success",
         "filters": {
-            "categories": category_list,
-            "formats": material_list,  # Changed from formats to materials
+            "categories": categories,
+            "formats": materials,  # Changed from formats to materials
             "price_range": {
-                "min": float(min_price),
-                "max": float(max_price)
+                "min": float(min_price if min_price is not None else 0),
+                "max": float(max_price if max_price is not None else 10000)
             }
         }
     }), 200
@@ -122,7 +210,10 @@ def signup():
         email=data["email"],
         phone=data["phone"]
     )
-    new_user.set_password(data["password"])
+    try:
+        new_user.set_password(data["password"])
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
 
     db.session.add(new_user)
     db.session.commit()
@@ -153,19 +244,20 @@ def login():
     if not identifier or not password:
         return jsonify({"error": "Name/Email/Phone and password required"}), 400
 
-    # ✅ Try matching in order: email → phone → name
-    if "@" in identifier:
-        signup_user = Signup.query.filter_by(email=identifier).first()
-    elif identifier.isdigit():
-        signup_user = Signup.query.filter_by(phone=identifier).first()
-    else:
-        signup_user = Signup.query.filter_by(name=identifier).first()
+    # ✅ Try matching in order: email → phone → name (signup and users rows in one query)
+    signup_user, user = Signup.find_with_user(identifier)
 
-    if not signup_user or not signup_user.check_password(password):
-        return jsonify({"error": "Invalid credentials"}), 401
+    try:
+        if not signup_user or not signup_user.check_password(password):
+            return jsonify({"error": "Invalid credentials"}), 401
+
+        # Upgrade hashes made with an older method/cost while we have the plain password
+        if signup_user.password_needs_rehash():
+            signup_user.set_password(password)
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
 
     # ✅ Ensure user exists in users table
-    user = User.query.filter_by(email=signup_user.email).first()
     if not user:
         user = User(
             email=signup_user.email,
@@ -176,9 +268,22 @@ def login():
         )
         db.session.add(user)
     else:
-        user.status = "active"
-
-    db.session.commit()
+        if user.status != "active":
+            user.status = "active"
+        if user.password != signup_user.password_hash:
+            user.password = signup_user.password_hash
+
+    # A returning, already active user needs no write at all
+    if db.session.new or db.session.dirty:
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent first login created the users row first
+            db.session.rollback()
+            signup_user, user = Signup.find_with_user(identifier)
+            if not user:
+                raise
+        invalidate_user(user.id)
 
     # ✅ Generate JWT token
     token = encode_auth_token(user.id)
@@ -313,10 +418,10 @@ def oauth_login():
 @app.route("/api/profile", methods=["GET"])
 @auth
 def profile(current_user):
-    signup_user = Signup.query.filter_by(email=current_user.email).first()
+    name = db.session.query(Signup.name).filter_by(email=current_user.email).scalar()
     return jsonify({
         "id": current_user.id,
-        "name": signup_user.name if signup_user else None,
+        "name": name,
         "email": current_user.email,
         "role": current_user.role,
         "status": current_user.status
@@ -326,6 +431,8 @@ def profile(current_user):
 @app.route("/api/logout", methods=["POST"])
 @auth
 def logout(current_user):
-    current_user.status = "inactive"
+    user = current_user.load()
+    user.status = "inactive"
     db.session.commit()
-    return jsonify({"message": "Logout successful", "status": current_user.status}), 200
+    invalidate_user(user.id)
+    return jsonify({"message": "Logout successful", "status": user.status}), 200
@@ -7,7 +7,6 @@ from utils.email_service import EmailService
 from db import db
 from datetime import datetime
 import random
-import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -175,10 +174,13 @@ def track_order_realtime(current_user, order_id):
         if order.user_id != current_user.id:
             return jsonify({"status": "error", "message": "Unauthorized"}), 403
         
+        # Encode while the app context is still active; the generator runs after it is gone
+        initial_event = app.json.dumps(order.to_dict(include_timeline=True))
+
         def generate():
             """Generate SSE events"""
             # Send initial order status
-            yield f"data: {json.dumps(order.to_dict(include_timeline=True))}\n\n"
+            yield f"data: {initial_event}\n\n"
             
             # In a real implementation, this would listen to a message queue (Redis)
             # For now, we'll just send periodic updates
@@ -1,25 +1,55 @@
-from flask import jsonify, current_app as app
+from flask import request, jsonify, current_app as app
+from datetime import datetime
 from auth import auth
-from models.orders import Order
+from models.order_stats import UserOrderStats
+from models.order_items import OrderItem
+from utils.pagination import parse_limit
 from db import db
 
 @app.route("/api/orders/count/<string:user_id>", methods=["GET"])
 @auth
 def get_orders_count(current_user, user_id):
-    """Get total count of orders for a specific user"""
+    """Order count, per-status counts and lifetime spend of a user, read from the order counters"""
     try:
         # Security check: Ensure querying user matches current user or is admin
         # Converting IDs to strings for comparison just in case
         if str(current_user.user_id) != str(user_id) and current_user.role != 'admin':
             return jsonify({"status": "error", "message": "Unauthorized"}), 403
             
-        count = Order.query.filter_by(user_id=current_user.id).count()
+        stats = UserOrderStats.for_user(current_user.id)
         
         return jsonify({
             "status": "success",
             "user_id": user_id,
-            "count": count
+            "count": stats["count"],
+            "by_status": stats["by_status"],
+            "lifetime_spend": stats["lifetime_spend"]
         }), 200
         
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route("/api/admin/sales/products", methods=["GET"])
+@auth
+def get_product_sales(current_user):
+    """
+    Best selling products from order_items
+
+    Query params: since, until (ISO dates, until exclusive), limit
+    """
+    if current_user.role != 'admin':
+        return jsonify({"status": "error", "message": "Unauthorized"}), 403
+
+    try:
+        since = datetime.fromisoformat(request.args["since"]) if request.args.get("since") else None
+        until = datetime.fromisoformat(request.args["until"]) if request.args.get("until") else None
+    except ValueError:
+        return jsonify({"status": "error", "message": "since and until must be ISO dates"}), 400
+
+    sales = OrderItem.sales_by_product(since, until, limit=parse_limit(request.args.get("limit"), default=50))
+    return jsonify({
+        "status": "success",
+        "count": len(sales),
+        "data": sales
+    }), 200
@@ -2,11 +2,18 @@ from flask import request, jsonify, current_app as app
 from polars import datetime
 from db import db
 from models.billing import BillingInfo
+from models.cart import Cart
 from models.orders import Order
+from models.order_items import OrderItem
 from models.payment_details import PaymentDetail
 
 from models.reviews import Review
 from models.products import Product
+from models.rating_summary import ProductRatingSummary, RATING_VALUES
+from models.stock_reservation import StockReservation
+from utils.cart_cache import invalidate_cart
+from utils.pagination import InvalidCursor, keyset_paginate, paginate_if_requested, parse_limit
+from sqlalchemy.orm import joinedload
 
 import random
 from auth import auth
@@ -159,6 +166,31 @@ def get_primary_billing_info(current_user):
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def checkout_cart_lines(user_id, order_rows):
+    """
+    Remove the buyer's cart lines an order was placed from, matched on
+    product and size (an item without a size matches any), and turn their
+    stock holds into the sale. The caller commits.
+    """
+    sizes = {}
+    for row in order_rows:
+        sizes.setdefault(row["product_id"], set()).add(row["size"])
+    if not sizes:
+        return []
+
+    lines = [
+        line for line in
+        Cart.query.options(joinedload(Cart.product))
+        .filter(Cart.user_id == user_id, Cart.product.has(Product.id.in_(sizes)))
+        .all()
+        if None in sizes[line.product.id] or line.size in sizes[line.product.id]
+    ]
+    StockReservation.sell(lines)
+    for line in lines:
+        db.session.delete(line)
+    return lines
+
+
 # In your Flask app routes
 @app.route("/api/orders", methods=["POST"])
 @auth
@@ -184,7 +216,13 @@ def create_order(current_user):
         )
 
         db.session.add(order)
+        db.session.flush()
+        order_rows = OrderItem.write_for_order(order)
+        # The units held for these lines are sold, not handed back at expiry
+        sold_lines = checkout_cart_lines(current_user.id, order_rows)
         db.session.commit()
+        if sold_lines:
+            invalidate_cart(current_user.id)
 
         return jsonify({
             "status": "success",
@@ -233,10 +271,28 @@ def get_order(current_user, order_id):
 @app.route("/api/orders/user/<int:user_id>", methods=["GET"])
 @auth
 def get_orders_by_user(current_user, user_id):
+    """
+    Newest-first order history; cursor paginated when ?limit= or ?cursor=
+    is sent, otherwise every order as the orders page expects
+
+    Optional filters: order_status, payment_status (comma separated).
+    Billing info is joined into the page query.
+    """
     if current_user.id != user_id:
         return jsonify({"status": "error", "message": "Unauthorized access"}), 403
 
-    orders = Order.query.filter_by(user_id=user_id).all()
+    query = Order.query.filter_by(user_id=user_id).options(joinedload(Order.billing_info))
+    for field in ("order_status", "payment_status"):
+        values = [v.strip() for v in request.args.get(field, "").split(",") if v.strip()]
+        if values:
+            query = query.filter(getattr(Order, field).in_(values))
+
+    try:
+        orders, next_cursor = paginate_if_requested(
+            query, "newest", Order.order_date, Order.id, request.args
+        )
+    except InvalidCursor as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
 
     if not orders:
         return jsonify({"status": "error", "message": "No orders found"}), 404
@@ -244,7 +300,9 @@ def get_orders_by_user(current_user, user_id):
     return jsonify({
         "status": "success",
         "count": len(orders),
-        "orders": [order.to_dict() for order in orders]
+        "orders": [order.to_dict() for order in orders],
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
     }), 200
 
 
@@ -425,6 +483,8 @@ def rate_order_products(current_user, order_id):
         if order.order_status != "delivered":
             return jsonify({"error": "Only delivered orders can be rated"}), 400
 
+        purchased_ids = OrderItem.purchased_product_ids(order)
+
         created_reviews = []
         for rating_item in data["ratings"]:
             product_id = rating_item.get("product_id")
@@ -434,34 +494,39 @@ def rate_order_products(current_user, order_id):
             if not product_id or rate is None:
                 return jsonify({"error": "Each rating must include product_id and rate"}), 400
 
+            if not isinstance(rate, int) or isinstance(rate, bool) or rate not in RATING_VALUES:
+                return jsonify({"error": "rate must be an integer from 1 to 5"}), 400
+
             # Check if product exists
             product = Product.query.get(product_id)
             if not product:
                 return jsonify({"error": f"Product {product_id} not found"}), 404
 
             # Check if the user actually bought this product
-            purchased = any(item.get("product_id") == product_id for item in order.items)
-            if not purchased:
+            if product.id not in purchased_ids:
                 return jsonify({"error": f"You can only rate products you purchased. Product {product_id} not in your order."}), 403
 
             # Check if review exists
             existing_review = Review.query.filter_by(user_id=current_user.id, product_id=product_id).first()
             if existing_review:
+                old_rate = existing_review.rates
                 existing_review.rates = rate
                 existing_review.description = description
                 existing_review.verified = True
                 db.session.add(existing_review)
+                ProductRatingSummary.record_rating(product.id, old_rate, rate)
                 created_reviews.append(existing_review)
             else:
                 review = Review(
                     user_id=current_user.id,
                     product_id=product_id,
-                    username=current_user.username,
+                    username=current_user.email,
                     rates=rate,
                     description=description,
                     verified=True
                 )
                 db.session.add(review)
+                ProductRatingSummary.record_rating(product.id, None, rate)
                 created_reviews.append(review)
 
         db.session.commit()
@@ -483,44 +548,75 @@ def rate_order_products(current_user, order_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/products/<int:product_id>/ratings", methods=["GET"])
-def get_product_ratings(product_id):
+# Upper bound on ids per batch request (a listing page shows at most 100 cards)
+MAX_RATING_BATCH = 100
+
+
+@app.route("/api/products/ratings", methods=["GET"])
+def get_products_ratings():
+    """Rating aggregates for many products at once: ?ids=1,2,3 (Product.id values)"""
     try:
-        reviews = Review.query.filter_by(product_id=product_id).all()
-        
-        if not reviews:
-            return jsonify({
-                "status": "success",
-                "average_rating": 0,
-                "total_reviews": 0,
-                "ratings_breakdown": {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0},
-                "reviews": []
-            }), 200
-        
-        # Calculate average rating
-        total_rating = sum(review.rates for review in reviews)
-        average_rating = total_rating / len(reviews)
-        
-        # Calculate ratings breakdown
-        ratings_breakdown = {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0}
-        for review in reviews:
-            ratings_breakdown[str(review.rates)] += 1
-        
+        product_ids = list(dict.fromkeys(
+            int(part) for part in request.args.get("ids", "").split(",") if part.strip()
+        ))
+    except ValueError:
+        return jsonify({"status": "error", "message": "ids must be comma separated integers"}), 400
+
+    if not product_ids:
+        return jsonify({"status": "error", "message": "ids is required"}), 400
+    if len(product_ids) > MAX_RATING_BATCH:
+        return jsonify({"status": "error", "message": f"At most {MAX_RATING_BATCH} ids per request"}), 400
+
+    try:
+        ratings = ProductRatingSummary.for_products(product_ids)
         return jsonify({
             "status": "success",
-            "average_rating": round(average_rating, 1),
-            "total_reviews": len(reviews),
-            "ratings_breakdown": ratings_breakdown,
-            "reviews": [{
-                "id": review.id,
-                "user_id": review.user_id,
-                "username": review.username,
-                "rate": review.rates,
-                "description": review.description,
-                "verified": review.verified,
-                "created_at": review.created_at.isoformat()
-            } for review in reviews]
+            "ratings": {str(product_id): ratings[product_id] for product_id in product_ids}
         }), 200
-        
+
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/products/<int:product_id>/ratings", methods=["GET"])
+def get_product_ratings(product_id):
+    """Rating aggregates for one product; review texts are served by /reviews"""
+    try:
+        # Same path as listings, so a product not summarized yet still shows its reviews
+        ratings = ProductRatingSummary.for_products([product_id])[product_id]
+
+        return jsonify({"status": "success", **ratings}), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/products/<int:product_id>/reviews", methods=["GET"])
+def get_product_reviews(product_id):
+    """Newest-first review texts, cursor paginated (?cursor=&limit=)"""
+    try:
+        reviews, next_cursor = keyset_paginate(
+            Review.query.filter_by(product_id=product_id),
+            "newest", Review.created_at, Review.id,
+            descending=True,
+            cursor=request.args.get("cursor"),
+            limit=parse_limit(request.args.get("limit"))
+        )
+    except InvalidCursor as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    return jsonify({
+        "status": "success",
+        "count": len(reviews),
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+        "reviews": [{
+            "id": review.id,
+            "user_id": review.user_id,
+            "username": review.username,
+            "rate": review.rates,
+            "description": review.description,
+            "verified": review.verified,
+            "created_at": review.created_at
+        } for review in reviews]
+    }), 200
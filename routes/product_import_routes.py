@@ -0,0 +1,50 @@
+# routes/product_import_routes.py
+from flask import request, jsonify, current_app as app
+from auth import auth
+from utils.product_import import ProductImporter
+import io
+import logging
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+
+@app.route("/api/admin/products/import", methods=["POST"])
+@auth
+def import_products(current_user):
+    """Bulk import a CSV or JSONL catalog sent as multipart field 'file'"""
+    if current_user.role != 'admin':
+        return jsonify({"status": "error", "message": "Unauthorized"}), 403
+
+    upload = request.files.get("file")
+    if not upload:
+        return jsonify({"status": "error", "message": "file is required"}), 400
+
+    file_format = (request.form.get("format") or upload.filename.rsplit(".", 1)[-1]).lower()
+    if file_format not in IMPORT_FORMATS:
+        return jsonify({"status": "error", "message": f"format must be one of {', '.join(IMPORT_FORMATS)}"}), 400
+
+    batch_size = min(request.form.get("batch_size", 500, type=int), 5000)
+
+    def log_progress(report):
+        logger.info(f"Product import by {current_user.email}: {report['processed']} rows read, "
+                    f"{report['inserted']} inserted, {report['failed']} failed")
+
+    importer = ProductImporter(
+        seller_id=request.form.get("seller_id", current_user.id, type=int),
+        seller_name=request.form.get("seller_name", current_user.email),
+        batch_size=max(batch_size, 1),
+        progress=log_progress
+    )
+    # Werkzeug spools large uploads to disk; wrap the stream instead of reading it into memory
+    report = importer.run(io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline=""), file_format)
+
+    if report["unreadable_from_row"]:
+        return jsonify({
+            "status": "error",
+            "message": f"File is not valid UTF-8 from row {report['unreadable_from_row']}; {report['inserted']} rows before it were imported",
+            **report
+        }), 400
+
+    return jsonify({"status": "success", **report}), 200
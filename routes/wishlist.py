@@ -1,16 +1,85 @@
 from flask import request, jsonify, current_app as app
+from sqlalchemy.orm import joinedload
 from models.wishlists import Wishlist
 from models.products import Product
+from models.rating_summary import ProductRatingSummary
 from db import db
 from auth import auth
+from utils.pagination import InvalidCursor, paginate_if_requested
+from utils.wishlist_cache import wishlist_ids_cache, invalidate_wishlist
+
+# Most product_ids one membership check may ask about
+MAX_MEMBERSHIP_IDS = 500
+
+
+def wishlisted_product_ids(user_id):
+    """The user's wishlisted product_ids as a frozenset, cached per user"""
+    product_ids = wishlist_ids_cache.get(user_id)
+    if product_ids is None:
+        product_ids = frozenset(
+            product_id for (product_id,) in
+            db.session.query(Wishlist.product_id).filter_by(user_id=user_id)
+        )
+        wishlist_ids_cache.set(user_id, product_ids)
+    return product_ids
+
 
 @app.route("/api/wishlist", methods=["GET"])
 @auth
 def get_wishlist(current_user):
-    wishlist_items = Wishlist.query.filter_by(user_id=current_user.id).all()
+    """
+    Newest-first wishlist; cursor paginated when ?limit= or ?cursor= is
+    sent, otherwise the whole list as the wishlist page expects
+
+    Products are joined into the list query and ratings come from the
+    rating summaries in one more query, whatever the length.
+    """
+    try:
+        wishlist_items, next_cursor = paginate_if_requested(
+            Wishlist.query.filter_by(user_id=current_user.id).options(joinedload(Wishlist.product)),
+            "newest", Wishlist.created_at, Wishlist.id, request.args
+        )
+    except InvalidCursor as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    ratings = ProductRatingSummary.for_products([item.product.id for item in wishlist_items if item.product])
+    return jsonify({
+        "status": "success",
+        "data": [
+            item.to_dict(ratings[item.product.id] if item.product else ProductRatingSummary.empty_dict())
+            for item in wishlist_items
+        ],
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    })
+
+
+@app.route("/api/wishlist/ids", methods=["GET"])
+@auth
+def get_wishlist_ids(current_user):
+    """Every product_id on the user's wishlist, for marking listing cards"""
+    product_ids = wishlisted_product_ids(current_user.id)
+    return jsonify({
+        "status": "success",
+        "count": len(product_ids),
+        "data": sorted(product_ids)
+    })
+
+
+@app.route("/api/wishlist/contains", methods=["GET"])
+@auth
+def wishlist_contains(current_user):
+    """Membership of many products at once: ?ids=PRD-001,PRD-002 -> {product_id: bool}"""
+    requested = [product_id.strip() for product_id in request.args.get("ids", "").split(",") if product_id.strip()]
+    if not requested:
+        return jsonify({"status": "error", "message": "ids is required"}), 400
+    if len(requested) > MAX_MEMBERSHIP_IDS:
+        return jsonify({"status": "error", "message": f"At most {MAX_MEMBERSHIP_IDS} ids per request"}), 400
+
+    product_ids = wishlisted_product_ids(current_user.id)
     return jsonify({
         "status": "success",
-        "data": [item.to_dict() for item in wishlist_items]
+        "data": {product_id: product_id in product_ids for product_id in requested}
     })
 
 
@@ -44,6 +113,7 @@ def add_to_wishlist(current_user):
     )
     db.session.add(new_item)
     db.session.commit()
+    invalidate_wishlist(current_user.id)
 
     return jsonify({"message": "Added to wishlist"}), 201
 
@@ -60,5 +130,6 @@ def remove_from_wishlist(current_user, product_id):
 
     db.session.delete(item)
     db.session.commit()
+    invalidate_wishlist(current_user.id)
 
     return jsonify({"message": "Removed from wishlist"}), 200
@@ -1,13 +1,18 @@
-from flask import Flask, send_from_directory
 from flask_cors import CORS, cross_origin
 from flask_swagger_ui import get_swaggerui_blueprint
 import os, json
-from db import db
+from db import db, ensure_indexes
+from utils.product_search import ensure_search_index
 from config import Config
-from models import signup, users, products, orders, wishlists, reviews, cart, billing, payment_details, email_otp, order_timeline, qr_payment
+from utils.json_provider import FastJSONProvider
+from utils.password_hasher import password_hasher
+from utils.static_assets import PrecompressedFlask, STATIC_ROOT, serve_static
+from models import signup, users, products, orders, wishlists, reviews, cart, billing, payment_details, email_otp, order_timeline, qr_payment, product_facets, id_counters, rating_summary, stock_reservation, order_stats, order_items
 
 
-app = Flask(__name__, static_folder="static")
+# /static/<path> (uploads, image variants) gets the same caching as the SPA files
+app = PrecompressedFlask(__name__, static_folder="static")
+app.json = FastJSONProvider(app)
 CORS(app)
 # CORS(app, origins=["https://yourdomain.com"])
 
@@ -25,30 +30,35 @@ app.register_blueprint(swagger_ui_blueprint, url_prefix=SWAGGER_URL)
 
 with app.app_context():
     db.create_all()
+    ensure_indexes()
+    ensure_search_index(db.engine)
     db.session.commit()
-    from routes import main, carts, wishlist, payments_routes, email_routes, order_tracking_routes, qr_payment_routes, payment_integration_routes, orders_routes
+    from routes import main, carts, wishlist, payments_routes, email_routes, order_tracking_routes, qr_payment_routes, payment_integration_routes, orders_routes, product_import_routes
 
 
-root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+# .br/.gz siblings are written at build time by precompress_static.py
+root = STATIC_ROOT
 
 
 @app.route("/<path:path>", methods=["GET"])
 def static_files(path):
-    return send_from_directory(root, path)
+    return serve_static(root, path)
 
 
 @app.route("/", methods=["GET"])
 def index():
-    return send_from_directory(root, "index.html")
+    return serve_static(root, "index.html")
 
 @app.route("/home", methods=["GET"])
 def index1():
-    return send_from_directory(root, "index.html")
+    return serve_static(root, "index.html")
 
 
 @app.after_request
 def adding_header_content(head):
-    head.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+    # Files sent by serve_static/send_file already carry their own Cache-Control
+    if "Cache-Control" in head.headers:
+        return head
     head.headers["Pragma"] = "no-cache"
     head.headers["Expires"] = "0"
     head.headers["Cache-Control"] = "public, max-age=0"
@@ -56,6 +66,8 @@ def adding_header_content(head):
 
 
 if __name__ == "__main__":
+    # Fork the hashing workers while this process is still single threaded
+    password_hasher.start()
     app.run(host=Config.HOST, port=Config.PORT, debug=True, threaded=True)
 
 
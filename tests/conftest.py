@@ -0,0 +1,62 @@
+# tests/conftest.py
+import os
+
+# Hash passwords inline; a process pool is pointless for a handful of logins
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+
+import pytest
+from sqlalchemy import event
+from benchmarks.bench_app import create_bench_app
+from db import db, ensure_indexes
+from utils.auth_cache import auth_user_cache
+from utils.cart_cache import cart_cache
+from utils.catalog_cache import product_cache
+from utils.product_search import drop_search_index, ensure_search_index
+
+ROUTES = ("main", "carts", "payments_routes")
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The benchmarks' app factory against an in-memory SQLite database"""
+    return create_bench_app(routes=ROUTES, database_uri="sqlite://")
+
+
+@pytest.fixture
+def client(app):
+    """Test client over freshly created tables and empty worker caches"""
+    with app.app_context():
+        drop_search_index(db.engine)
+        db.drop_all()
+        db.create_all()
+        ensure_indexes()
+        ensure_search_index(db.engine)
+        db.session.commit()
+    for cache in (auth_user_cache, cart_cache, product_cache):
+        cache.clear()
+
+    yield app.test_client()
+
+    with app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def count_queries(app):
+    """Run a callable and return how many SQL statements it sent"""
+    def count(fn):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            fn()
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        return len(statements)
+
+    return count
@@ -0,0 +1,151 @@
+# tests/test_cart_queries.py
+"""
+The cart read path and the batch PATCH must cost a fixed number of SQL
+statements, however many lines the cart holds
+"""
+import pytest
+from sqlalchemy import event
+from db import db
+from models.cart import Cart
+from models.products import Product
+from models.signup import Signup
+from utils.cart_cache import cart_cache
+
+SMALL_CART = 2
+LARGE_CART = 20
+
+
+@pytest.fixture
+def shopper(app, client):
+    """Log a customer in; returns (auth headers, cart filler)"""
+    with app.app_context():
+        signup = Signup(name="shopper", email="shopper@example.com", phone="5550100")
+        signup.set_password("secret")
+        db.session.add(signup)
+        db.session.add_all([
+            Product(seller_id=1, seller_name="seller", title=f"Map {n}", category="maps",
+                    price=100 + n, stock=50, image_filename=[f"map-{n}.png"])
+            for n in range(LARGE_CART + 2)
+        ])
+        db.session.commit()
+        product_ids = [product.product_id for product in Product.query.order_by(Product.id)]
+
+    response = client.post("/api/login", json={"email": "shopper@example.com", "password": "secret"})
+    headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+    def fill_cart(lines):
+        """Put the first `lines` products in the cart, two of each"""
+        operations = [{"op": "add", "product_id": product_id, "qty": 2} for product_id in product_ids[:lines]]
+        assert client.patch("/api/cart", json={"operations": operations}, headers=headers).status_code == 200
+        return product_ids
+
+    # The first authenticated request warms the identity cache
+    client.get("/api/cart", headers=headers)
+    return headers, fill_cart
+
+
+def uncached_cart_queries(app, client, count_queries, headers):
+    cart_cache.clear()
+    with app.app_context():
+        db.session.expire_all()
+    return count_queries(lambda: client.get("/api/cart", headers=headers))
+
+
+def test_get_cart_query_count_is_constant(app, client, count_queries, shopper):
+    headers, fill_cart = shopper
+
+    fill_cart(SMALL_CART)
+    small = uncached_cart_queries(app, client, count_queries, headers)
+
+    fill_cart(LARGE_CART)
+    large = uncached_cart_queries(app, client, count_queries, headers)
+
+    assert small == large == 1
+
+
+def test_cached_cart_runs_no_queries(app, client, count_queries, shopper):
+    headers, fill_cart = shopper
+    fill_cart(LARGE_CART)
+    client.get("/api/cart", headers=headers)
+
+    assert count_queries(lambda: client.get("/api/cart", headers=headers)) == 0
+
+
+def test_cart_lines_are_priced_and_complete(app, client, shopper):
+    headers, fill_cart = shopper
+    fill_cart(LARGE_CART)
+
+    lines = client.get("/api/cart", headers=headers).get_json()
+    assert len(lines) == LARGE_CART
+    assert all(line["qty"] == 2 and line["title"] for line in lines)
+
+
+def batch_queries(client, count_queries, headers, product_ids, lines):
+    """Update one line, add one product and remove one line in a single PATCH"""
+    operations = [
+        {"op": "update", "product_id": product_ids[0], "qty": 3},
+        {"op": "add", "product_id": product_ids[LARGE_CART + 1], "qty": 1},
+        {"op": "remove", "product_id": product_ids[lines - 1]},
+    ]
+    statements = count_queries(lambda: client.patch("/api/cart", json={"operations": operations}, headers=headers))
+    # Put the cart back for the next measurement
+    client.patch("/api/cart", json={"operations": [
+        {"op": "remove", "product_id": product_ids[LARGE_CART + 1]},
+        {"op": "add", "product_id": product_ids[lines - 1], "qty": 2},
+    ]}, headers=headers)
+    return statements
+
+
+def test_batch_patch_query_count_is_constant(app, client, count_queries, shopper):
+    headers, fill_cart = shopper
+
+    product_ids = fill_cart(SMALL_CART)
+    small = batch_queries(client, count_queries, headers, product_ids, SMALL_CART)
+
+    fill_cart(LARGE_CART)
+    large = batch_queries(client, count_queries, headers, product_ids, LARGE_CART)
+
+    assert small == large
+
+
+def test_batch_patch_does_not_lazy_load_products(app, client, count_queries, shopper):
+    headers, fill_cart = shopper
+    product_ids = fill_cart(LARGE_CART)
+
+    selects = []
+    operations = [{"op": "update", "product_id": product_id, "qty": 1} for product_id in product_ids[:LARGE_CART]]
+
+    def patch():
+        with app.app_context():
+            engine = db.engine
+
+        def record(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("SELECT"):
+                selects.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            assert client.patch("/api/cart", json={"operations": operations}, headers=headers).status_code == 200
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    patch()
+    # products, cart lines with their products, stock holds, the priced cart
+    assert len(selects) == 4
+
+    with app.app_context():
+        assert {line.qty for line in Cart.query.all()} == {1}
+
+
+def test_lines_do_not_report_stored_per_line_shipping(app, client, shopper):
+    headers, fill_cart = shopper
+    fill_cart(SMALL_CART)
+    with app.app_context():
+        # Rows priced before shipping moved to the cart level
+        Cart.query.update({Cart.shipping_cost: 40})
+        db.session.commit()
+    cart_cache.clear()
+
+    summary = client.get("/api/cart/summary", headers=headers).get_json()
+    assert {line["shipping_cost"] for line in summary["items"]} == {0}
+    assert summary["summary"]["shipping_cost"] == 40
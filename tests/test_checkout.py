@@ -0,0 +1,76 @@
+# tests/test_checkout.py
+"""
+Placing an order sells the units its cart lines hold: the sweeper must not
+hand them back to stock when the holds would have expired
+"""
+from datetime import datetime, timedelta
+import pytest
+from db import db
+from models.cart import Cart
+from models.products import Product
+from models.signup import Signup
+from models.stock_reservation import STOCK_RESERVATION_TTL, StockReservation
+
+
+@pytest.fixture
+def buyer(app, client):
+    """Log a customer in with two products on sale; returns (auth headers, product_ids)"""
+    with app.app_context():
+        signup = Signup(name="buyer", email="buyer@example.com", phone="5550101")
+        signup.set_password("secret")
+        db.session.add(signup)
+        db.session.add_all([
+            Product(seller_id=1, seller_name="seller", title=f"Atlas {n}", category="maps", price=100, stock=10)
+            for n in range(2)
+        ])
+        db.session.commit()
+        product_ids = [product.product_id for product in Product.query.order_by(Product.id)]
+
+    response = client.post("/api/login", json={"email": "buyer@example.com", "password": "secret"})
+    return {"Authorization": f"Bearer {response.get_json()['token']}"}, product_ids
+
+
+def stock_of(app, product_id):
+    with app.app_context():
+        return Product.get_stock([product_id])[product_id]
+
+
+def sweep_after_expiry(app):
+    with app.app_context():
+        released = StockReservation.release_expired(now=datetime.utcnow() + STOCK_RESERVATION_TTL + timedelta(minutes=1))
+        db.session.commit()
+        return released
+
+
+def test_ordered_holds_stay_sold_after_expiry(app, client, buyer):
+    headers, (sold, kept) = buyer
+    for product_id in (sold, kept):
+        assert client.post("/api/cart", json={"product_id": product_id, "quantity": 3}, headers=headers).status_code == 201
+    assert stock_of(app, sold) == 7
+
+    response = client.post("/api/orders", json={
+        "items": [{"product_id": sold, "quantity": 3, "price": 100}],
+        "total_amount": 354,
+        "payment_method": "cod"
+    }, headers=headers)
+    assert response.status_code == 201
+
+    assert [line["product_id"] for line in client.get("/api/cart", headers=headers).get_json()] == [kept]
+    with app.app_context():
+        assert [line.product_id for line in Cart.query.all()] == [kept]
+        assert [hold.product_id for hold in StockReservation.query.all()] == [kept]
+
+    # Only the line left in the cart gives its units back
+    assert sweep_after_expiry(app) == {kept: 3}
+    assert stock_of(app, sold) == 7
+    assert stock_of(app, kept) == 10
+
+
+def test_sweeper_keeps_holds_that_have_not_expired(app, client, buyer):
+    headers, (product_id, _) = buyer
+    client.post("/api/cart", json={"product_id": product_id, "quantity": 2}, headers=headers)
+
+    with app.app_context():
+        assert StockReservation.release_expired() == {}
+        db.session.commit()
+    assert stock_of(app, product_id) == 8
@@ -0,0 +1,61 @@
+# tests/test_order_stats.py
+"""
+Per-user order counters must match the orders table, however many of a
+user's orders one flush writes
+"""
+from decimal import Decimal
+from db import db
+from models.order_stats import UserOrderStats, UserOrderStatusCount
+from models.orders import Order
+
+USER_ID = 7
+
+
+def place(count, status="placed", amount=10):
+    return [
+        Order(user_id=USER_ID, items=[], total_amount=amount, payment_method="cod", order_status=status)
+        for _ in range(count)
+    ]
+
+
+def test_multi_order_flush_counts_each_order_once(app, client):
+    with app.app_context():
+        db.session.add_all(place(3))
+        db.session.commit()
+
+        assert UserOrderStats.for_user(USER_ID) == {
+            "count": 3, "by_status": {"placed": 3}, "lifetime_spend": Decimal("30.00")
+        }
+
+
+def test_counters_follow_mixed_flushes(app, client):
+    with app.app_context():
+        db.session.add_all(place(2))
+        db.session.commit()
+
+        # New orders, a status change and a delete of the same user in one flush
+        first, second = Order.query.order_by(Order.id).all()
+        first.order_status = "cancelled"
+        db.session.delete(second)
+        db.session.add_all(place(2, status="delivered", amount=25))
+        db.session.commit()
+
+        assert UserOrderStats.for_user(USER_ID) == {
+            "count": 3, "by_status": {"cancelled": 1, "delivered": 2}, "lifetime_spend": Decimal("50.00")
+        }
+
+
+def test_counters_of_existing_orders_are_built_before_the_flush(app, client):
+    with app.app_context():
+        db.session.add_all(place(2))
+        db.session.commit()
+        # As before the backfill: orders but no counters
+        UserOrderStatusCount.query.delete()
+        UserOrderStats.query.delete()
+        db.session.commit()
+
+        db.session.add_all(place(2))
+        db.session.commit()
+
+        assert db.session.get(UserOrderStats, USER_ID).order_count == 4
+        assert UserOrderStats.for_user(USER_ID)["by_status"] == {"placed": 4}
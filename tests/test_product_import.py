@@ -0,0 +1,32 @@
+# tests/test_product_import.py
+"""Bulk catalog import: row validation and uploads that stop decoding part way"""
+import io
+from db import db
+from models.products import Product
+from utils.product_import import ProductImporter
+
+HEADER = b"title,category,price,stock\n"
+
+
+def run_import(app, data, batch_size=2):
+    with app.app_context():
+        importer = ProductImporter(seller_id=1, seller_name="seller", batch_size=batch_size)
+        report = importer.run(io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", newline=""), "csv")
+        return report, db.session.query(Product).count()
+
+
+def test_negative_stock_is_rejected(app, client):
+    report, stored = run_import(app, HEADER + b"Atlas,maps,10,3\nGlobe,maps,10,-1\n")
+
+    assert report["inserted"] == stored == 1
+    assert report["errors"] == [{"row": 2, "error": "stock must be >= 0"}]
+
+
+def test_invalid_utf8_keeps_committed_rows_and_reports_them(app, client):
+    good_rows = b"".join(b"Map %d,maps,10,1\n" % n for n in range(3000))
+    report, stored = run_import(app, HEADER + good_rows + b"Bad \xff\xfe,maps,10,1\n", batch_size=500)
+
+    assert report["unreadable_from_row"] is not None
+    assert report["inserted"] == stored > 0
+    assert report["errors"][-1]["row"] == report["unreadable_from_row"]
+    assert "UTF-8" in report["errors"][-1]["error"]
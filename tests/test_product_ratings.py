@@ -0,0 +1,26 @@
+# tests/test_product_ratings.py
+"""
+A product's detail page and the batch ratings endpoint must agree, also
+for products whose summary row has not been built yet
+"""
+from db import db
+from models.products import Product
+from models.reviews import Review
+
+
+def test_unsummarized_product_shows_its_reviews(app, client):
+    with app.app_context():
+        product = Product(seller_id=1, seller_name="seller", title="Globe", category="maps", price=100, stock=1)
+        db.session.add(product)
+        db.session.flush()
+        # Written straight to the table, as reviews were before the summaries existed
+        db.session.add_all([Review(user_id=1, product_id=product.id, username="u", rates=rate) for rate in (3, 5)])
+        db.session.commit()
+        product_id = product.id
+
+    detail = client.get(f"/api/products/{product_id}/ratings").get_json()
+    listing = client.get(f"/api/products/ratings?ids={product_id}").get_json()["ratings"][str(product_id)]
+
+    assert detail["total_reviews"] == 2
+    assert detail["ratings_breakdown"]["5"] == 1
+    assert {key: detail[key] for key in listing} == listing
@@ -0,0 +1,18 @@
+# utils/auth_cache.py
+import os
+from utils.ttl_cache import TTLCache
+
+# Identity fields of authenticated users keyed by users.id, one cache per
+# worker process. Entries are dropped by the User after_update/after_delete
+# listeners in models/users.py and explicitly by login/logout; the TTL bounds
+# staleness for writes made by other processes.
+auth_user_cache = TTLCache(
+    maxsize=int(os.environ.get("AUTH_USER_CACHE_SIZE", "10000")),
+    ttl=int(os.environ.get("AUTH_USER_CACHE_TTL", "60"))
+)
+
+
+def invalidate_user(user_id):
+    """Drop a user's identity from this worker's cache"""
+    if user_id:
+        auth_user_cache.delete(user_id)
@@ -0,0 +1,115 @@
+# utils/cart_cache.py
+import os
+import threading
+from collections import defaultdict
+from utils.ttl_cache import TTLCache
+
+
+class CartCache:
+    """
+    Priced carts keyed by users.id, one cache per worker process
+
+    Remembers which products each cached cart contains, so a price or stock
+    change drops exactly the carts that show that product. Cart routes drop
+    a user's entry on every mutation; the TTL bounds staleness for writes
+    made by other processes.
+
+    A load that started before an invalidation must not cache what it read:
+    callers take a token with begin_load() before reading and pass it to
+    set(), which discards the cart if the user was invalidated since.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self._carts = TTLCache(maxsize=maxsize, ttl=ttl, on_evict=self._forget)
+        self._products = {}  # user_id -> (cached priced cart, its product_ids)
+        self._holders = defaultdict(set)  # product_id -> user_ids caching it
+        # user_id -> clock value of the user's last invalidation; loads older
+        # than an evicted stamp are covered by _floor
+        self._invalidated = TTLCache(maxsize=maxsize, ttl=ttl, on_evict=self._raise_floor)
+        self._clock = 0
+        self._floor = 0
+        self._lock = threading.RLock()
+
+    def get(self, user_id):
+        return self._carts.get(user_id)
+
+    def begin_load(self):
+        """Token to pass to set() for a cart read from the database after this call"""
+        with self._lock:
+            return self._clock
+
+    def set(self, user_id, priced_cart, product_ids, token):
+        with self._lock:
+            if token < self._floor or self._invalidated.get(user_id, -1) > token:
+                return False
+            self._unlink(user_id)
+            self._products[user_id] = (priced_cart, frozenset(product_ids))
+            for product_id in product_ids:
+                self._holders[product_id].add(user_id)
+            self._carts.set(user_id, priced_cart)
+            return True
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            self._stamp(user_id)
+            self._unlink(user_id)
+            self._carts.delete(user_id)
+
+    def invalidate_product(self, product_id):
+        with self._lock:
+            for user_id in self._holders.pop(product_id, ()):
+                self._stamp(user_id)
+                self._unlink(user_id)
+                self._carts.delete(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._clock += 1
+            self._floor = self._clock
+            self._products.clear()
+            self._holders.clear()
+            self._invalidated.clear()
+            self._carts.clear()
+
+    def stats(self):
+        stats = self._carts.stats()
+        with self._lock:
+            stats["tracked_products"] = len(self._holders)
+        return stats
+
+    def _stamp(self, user_id):
+        self._clock += 1
+        self._invalidated.set(user_id, self._clock)
+
+    def _unlink(self, user_id):
+        """Remove a user from the holder sets of the products its cached cart showed"""
+        _, product_ids = self._products.pop(user_id, (None, ()))
+        for product_id in product_ids:
+            holders = self._holders.get(product_id)
+            if holders is not None:
+                holders.discard(user_id)
+                if not holders:
+                    del self._holders[product_id]
+
+    def _forget(self, user_id, priced_cart):
+        # The cart expired or was pushed out by the size bound; skip if the
+        # user has been cached again since
+        with self._lock:
+            if self._products.get(user_id, (None,))[0] is priced_cart:
+                self._unlink(user_id)
+
+    def _raise_floor(self, user_id, stamp):
+        with self._lock:
+            self._floor = max(self._floor, stamp)
+
+
+cart_cache = CartCache(
+    maxsize=int(os.environ.get("CART_CACHE_SIZE", "10000")),
+    ttl=int(os.environ.get("CART_CACHE_TTL", "120"))
+)
+
+
+def invalidate_cart(user_id):
+    """Drop a user's priced cart from this worker's cache"""
+    if user_id:
+        cart_cache.invalidate_user(user_id)
@@ -0,0 +1,20 @@
+# utils/catalog_cache.py
+import os
+from utils.ttl_cache import TTLCache
+from utils.cart_cache import cart_cache
+
+# Serialized Product documents, without stock, keyed by product_id, one cache
+# per worker process. Entries are dropped after commit for products written in
+# the session (see invalidate_after_commit in models/products.py); the TTL
+# bounds staleness for writes made by other processes.
+product_cache = TTLCache(
+    maxsize=int(os.environ.get("PRODUCT_CACHE_SIZE", "5000")),
+    ttl=int(os.environ.get("PRODUCT_CACHE_TTL", "300"))
+)
+
+
+def invalidate_product(product_id):
+    """Drop a product document, and every cached cart showing it, from this worker's caches"""
+    if product_id:
+        product_cache.delete(product_id)
+        cart_cache.invalidate_product(product_id)
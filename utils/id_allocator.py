@@ -0,0 +1,102 @@
+# utils/id_allocator.py
+import os
+import threading
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+
+class BlockIdAllocator:
+    """
+    Hands out sequential public ids like PRD-001 from the id_counters table
+
+    Each worker reserves a block of numbers with one short UPDATE in its own
+    transaction and then serves ids from memory, so concurrent inserts never
+    see the same number and most inserts need no round trip at all. Numbers
+    left in a block when a worker exits are skipped, like a database sequence.
+
+    SQLite only allows one writer at a time, so there the reservation runs
+    on the caller's connection and claims exactly what it needs; a rollback
+    of the caller then also returns the numbers.
+    """
+
+    def __init__(self, name, prefix, seed_sql, block_size=50, width=3):
+        self.name = name
+        self.prefix = prefix
+        self.seed_sql = seed_sql
+        self.block_size = block_size
+        self.width = width
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def format(self, number):
+        return f"{self.prefix}{number:0{self.width}d}"
+
+    def next_id(self, connection):
+        """Return one new id; `connection` is the connection doing the insert"""
+        if connection.dialect.name == "sqlite":
+            return self.format(self._claim(connection, 1))
+
+        with self._lock:
+            if self._next >= self._end:
+                with connection.engine.begin() as own_connection:
+                    self._next = self._claim(own_connection, self.block_size)
+                self._end = self._next + self.block_size
+            number = self._next
+            self._next += 1
+        return self.format(number)
+
+    def reserve(self, connection, count):
+        """Return `count` new consecutive ids for a bulk insert"""
+        if count <= 0:
+            return []
+
+        if connection.dialect.name == "sqlite":
+            start = self._claim(connection, count)
+        else:
+            with connection.engine.begin() as own_connection:
+                start = self._claim(own_connection, count)
+        return [self.format(number) for number in range(start, start + count)]
+
+    def _claim(self, connection, count):
+        """Advance the counter by `count` and return the first claimed number"""
+        params = {"name": self.name, "count": count}
+        updated = connection.execute(
+            text("UPDATE id_counters SET next_value = next_value + :count WHERE name = :name"),
+            params
+        )
+        if updated.rowcount == 0:
+            self._seed(connection)
+            return self._claim(connection, count)
+
+        end = connection.execute(
+            text("SELECT next_value FROM id_counters WHERE name = :name"), params
+        ).scalar()
+        return end - count
+
+    def _seed(self, connection):
+        """Create the counter row, continuing after the last id issued before it existed"""
+        last_id = connection.execute(text(self.seed_sql)).scalar()
+        last_number = 0
+        if last_id and last_id.startswith(self.prefix):
+            try:
+                last_number = int(last_id[len(self.prefix):])
+            except ValueError:
+                pass
+
+        try:
+            with connection.begin_nested():
+                connection.execute(
+                    text("INSERT INTO id_counters (name, next_value) VALUES (:name, :next_value)"),
+                    {"name": self.name, "next_value": last_number + 1}
+                )
+        except IntegrityError:
+            pass  # another worker created it first
+
+
+product_id_allocator = BlockIdAllocator(
+    "product_id",
+    prefix="PRD-",
+    seed_sql="SELECT product_id FROM products ORDER BY id DESC LIMIT 1",
+    block_size=int(os.environ.get("PRODUCT_ID_BLOCK_SIZE", "50"))
+)
@@ -0,0 +1,174 @@
+# utils/image_pipeline.py
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+
+UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "uploads", "products")
+VARIANT_SUBDIR = "variants"
+MANIFEST_NAME = "manifest.json"
+PRODUCT_IMAGE_BASE_URL = os.environ.get("PRODUCT_IMAGE_BASE_URL", "http://127.0.0.1:5000/static/uploads/products")
+
+# variant name -> longest edge in pixels (images are never upscaled)
+VARIANTS = {
+    "thumbnail": 160,
+    "card": 480,
+    "detail": 1200,
+}
+
+# format -> (file extension, Pillow save options)
+FORMATS = {
+    "webp": ("webp", {"quality": 80, "method": 4}),
+    "jpeg": ("jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+SOURCE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp", ".tiff")
+
+# How long serializers trust the in-memory manifest before checking the file again
+MANIFEST_RECHECK_SECONDS = 5
+
+
+def _variant_hash(source_bytes, variant, file_format):
+    """Content hash of the source plus the settings that produced the variant"""
+    digest = hashlib.sha256(source_bytes)
+    digest.update(f"{variant}:{VARIANTS[variant]}:{file_format}:{sorted(FORMATS[file_format][1].items())}".encode())
+    return digest.hexdigest()[:12]
+
+
+def build_variants(source_path, variant_dir):
+    """
+    Write every variant of one image; runs inside a pool worker
+
+    Returns:
+        tuple: (original filename, manifest entry) - entry is None if the file is not an image
+    """
+    filename = os.path.basename(source_path)
+    stem = os.path.splitext(filename)[0]
+
+    with open(source_path, "rb") as handle:
+        source_bytes = handle.read()
+
+    try:
+        with Image.open(source_path) as opened:
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+    except (OSError, ValueError):
+        return filename, None
+
+    if image.mode in ("RGBA", "LA", "P"):
+        rgba = image.convert("RGBA")
+        flattened = Image.new("RGB", rgba.size, (255, 255, 255))
+        flattened.paste(rgba, mask=rgba.getchannel("A"))
+    else:
+        rgba, flattened = None, image.convert("RGB")
+
+    variants = {}
+    for variant, edge in VARIANTS.items():
+        variants[variant] = {}
+        for file_format, (extension, options) in FORMATS.items():
+            name = f"{stem}-{variant}-{_variant_hash(source_bytes, variant, file_format)}.{extension}"
+            target = os.path.join(variant_dir, name)
+            if not os.path.exists(target):
+                # WebP keeps transparency, JPEG gets a white background
+                resized = (rgba if rgba is not None and file_format == "webp" else flattened).copy()
+                resized.thumbnail((edge, edge), Image.LANCZOS)
+                resized.save(target + ".tmp", format=file_format.upper(), **options)
+                os.replace(target + ".tmp", target)
+            variants[variant][file_format] = f"{VARIANT_SUBDIR}/{name}"
+
+    return filename, {"width": image.width, "height": image.height, "variants": variants}
+
+
+def process_directory(upload_dir=UPLOAD_DIR, workers=None, progress=None):
+    """
+    Build variants for every original in `upload_dir` with a process pool,
+    then rewrite the manifest and delete variant files it no longer references
+
+    Returns:
+        dict: the new manifest
+    """
+    variant_dir = os.path.join(upload_dir, VARIANT_SUBDIR)
+    os.makedirs(variant_dir, exist_ok=True)
+
+    sources = sorted(
+        os.path.join(upload_dir, name) for name in os.listdir(upload_dir)
+        if name.lower().endswith(SOURCE_EXTENSIONS) and os.path.isfile(os.path.join(upload_dir, name))
+    )
+
+    manifest = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(build_variants, sources, [variant_dir] * len(sources))
+        for done, (filename, entry) in enumerate(results, start=1):
+            if entry is not None:
+                manifest[filename] = entry
+            if progress:
+                progress(done, len(sources), filename)
+
+    manifest_path = os.path.join(variant_dir, MANIFEST_NAME)
+    with open(manifest_path + ".tmp", "w") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    referenced = {
+        os.path.basename(path)
+        for entry in manifest.values()
+        for formats in entry["variants"].values()
+        for path in formats.values()
+    }
+    for name in os.listdir(variant_dir):
+        if name != MANIFEST_NAME and name not in referenced:
+            os.remove(os.path.join(variant_dir, name))
+
+    return manifest
+
+
+_manifest_lock = threading.Lock()
+_manifest_state = {"checked_at": 0.0, "mtime": None, "data": {}}
+
+
+def _load_manifest():
+    now = time.monotonic()
+    with _manifest_lock:
+        if now - _manifest_state["checked_at"] < MANIFEST_RECHECK_SECONDS:
+            return _manifest_state["data"]
+        _manifest_state["checked_at"] = now
+
+        path = os.path.join(UPLOAD_DIR, VARIANT_SUBDIR, MANIFEST_NAME)
+        try:
+            mtime = os.path.getmtime(path)
+            if mtime != _manifest_state["mtime"]:
+                with open(path) as handle:
+                    _manifest_state["data"] = json.load(handle)
+                _manifest_state["mtime"] = mtime
+        except (OSError, ValueError):
+            _manifest_state["data"], _manifest_state["mtime"] = {}, None
+        return _manifest_state["data"]
+
+
+def primary_image(image_filename):
+    """First filename of a JSON image list, or the legacy single string"""
+    if isinstance(image_filename, list):
+        return image_filename[0] if image_filename else None
+    return image_filename or None
+
+
+def variant_urls(image_filename):
+    """
+    URLs of the resized variants of an original image
+
+    Returns:
+        dict: {"thumbnail": {"webp": url, "jpeg": url}, "card": ..., "detail": ...}
+        or None when the image has not been processed yet
+    """
+    filename = primary_image(image_filename)
+    entry = _load_manifest().get(filename) if filename else None
+    if not entry:
+        return None
+
+    return {
+        variant: {file_format: f"{PRODUCT_IMAGE_BASE_URL}/{path}" for file_format, path in formats.items()}
+        for variant, formats in entry["variants"].items()
+    }
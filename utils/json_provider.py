@@ -0,0 +1,63 @@
+# utils/json_provider.py
+import json
+from datetime import date
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.engine import Row, RowMapping
+
+try:
+    import orjson
+except ImportError:  # optional speedup, the stdlib encoder is used without it
+    orjson = None
+
+
+def _default(value):
+    """Encode the types our models hand to jsonify as-is"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Row):
+        return value._asdict()
+    if isinstance(value, RowMapping):
+        return dict(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider for the whole app, registered in server.py
+
+    Natively handles Decimal (as float), date/datetime (ISO 8601) and
+    SQLAlchemy Row objects, so to_dict() methods can return column values
+    untouched. Uses orjson when it is installed.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            kwargs.setdefault("default", _default)
+            kwargs.setdefault("sort_keys", self.sort_keys)
+            kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+            return json.dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is None:
+            body = json.dumps(obj, default=_default, sort_keys=self.sort_keys, ensure_ascii=self.ensure_ascii)
+        else:
+            body = self._dumps_bytes(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+    def _dumps_bytes(self, obj):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_default, option=option)
@@ -0,0 +1,130 @@
+# utils/pagination.py
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that was not issued for this listing"""
+
+
+def parse_limit(raw_limit, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse a ?limit= value and clamp it to [1, maximum]"""
+    try:
+        limit = int(raw_limit) if raw_limit not in (None, "") else default
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
+
+
+def encode_cursor(sort_key, value, row_id):
+    """Build an opaque, URL-safe cursor pointing just after (value, row_id)"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+
+    payload = json.dumps({"s": sort_key, "v": value, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, sort_key, column):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        token: Cursor string sent by the client
+        sort_key: Sort the listing is currently using
+        column: Sort column, used to restore the value's python type
+
+    Returns:
+        tuple: (value, row_id)
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload.get("s") != sort_key:
+            raise InvalidCursor("Cursor does not match the requested sort")
+
+        value = payload["v"]
+        row_id = int(payload["id"])
+        python_type = column.type.python_type
+
+        if value is not None:
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is Decimal:
+                value = Decimal(value)
+            else:
+                value = python_type(value)
+    except InvalidCursor:
+        raise
+    except (binascii.Error, InvalidOperation, KeyError, TypeError, ValueError, AttributeError):
+        raise InvalidCursor("Malformed cursor")
+
+    return value, row_id
+
+
+def keyset_paginate(query, sort_key, column, id_column, descending=True, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Return one page of `query` ordered by (column, id_column)
+
+    The tie-breaking id keeps the order total, so a cursor always resumes
+    exactly after the last row of the previous page no matter how many rows
+    are inserted in between. Cost depends only on the page size as long as
+    an index on (column, id_column) exists.
+
+    Returns:
+        tuple: (rows, next_cursor) - next_cursor is None on the last page
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_key, column)
+        if descending:
+            query = query.filter(or_(column < value, and_(column == value, id_column < row_id)))
+        else:
+            query = query.filter(or_(column > value, and_(column == value, id_column > row_id)))
+
+    if descending:
+        query = query.order_by(column.desc(), id_column.desc())
+    else:
+        query = query.order_by(column.asc(), id_column.asc())
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    next_cursor = encode_cursor(sort_key, getattr(last, column.key), getattr(last, id_column.key))
+    return rows, next_cursor
+
+
+def paginate_if_requested(query, sort_key, column, id_column, args, descending=True):
+    """
+    keyset_paginate() when the request asks for a page (?limit= or
+    ?cursor=), otherwise every row in the same order and no next cursor
+
+    For listings whose existing clients read the whole list from one
+    response and never follow next_cursor.
+
+    Returns:
+        tuple: (rows, next_cursor)
+    """
+    if "limit" in args or "cursor" in args:
+        return keyset_paginate(
+            query, sort_key, column, id_column,
+            descending=descending,
+            cursor=args.get("cursor"),
+            limit=parse_limit(args.get("limit"))
+        )
+
+    if descending:
+        return query.order_by(column.desc(), id_column.desc()).all(), None
+    return query.order_by(column.asc(), id_column.asc()).all(), None
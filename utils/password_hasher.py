@@ -0,0 +1,120 @@
+# utils/password_hasher.py
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Werkzeug method string for new hashes; raise the cost here and existing
+# users are rehashed on their next successful login
+PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+# Hash jobs allowed in flight (running + queued) before callers are turned away
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 4)))
+# How long a request waits for a free slot / for its result, in seconds
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.environ.get("PASSWORD_HASH_QUEUE_TIMEOUT", "1"))
+PASSWORD_HASH_RESULT_TIMEOUT = float(os.environ.get("PASSWORD_HASH_RESULT_TIMEOUT", "10"))
+
+
+class PasswordHasherBusy(RuntimeError):
+    """The hashing pool is saturated or too slow; the caller should answer 503"""
+
+
+def _lazy_start_method():
+    # A pool created on first use is created from a request thread; forking a
+    # threaded process can copy locks held by other threads, so those workers
+    # are never forked from it
+    methods = multiprocessing.get_all_start_methods()
+    return "forkserver" if "forkserver" in methods else "spawn"
+
+
+class PasswordHasher:
+    """
+    Runs werkzeug password hashing in a bounded process pool
+
+    PBKDF2/scrypt are pure CPU work that holds the GIL, so doing it in the
+    request thread stalls every other request in the worker. Jobs go to a
+    small process pool instead. At most `max_pending` jobs may be in flight;
+    beyond that callers wait `queue_timeout` seconds for a slot and then get
+    PasswordHasherBusy, so a login storm degrades into fast 503s rather than
+    an unbounded queue.
+
+    With workers=0 hashing runs inline, which is what tests and one-off
+    scripts want.
+    """
+
+    def __init__(self, method=PASSWORD_HASH_METHOD, workers=PASSWORD_HASH_WORKERS,
+                 max_pending=PASSWORD_HASH_MAX_PENDING, queue_timeout=PASSWORD_HASH_QUEUE_TIMEOUT,
+                 result_timeout=PASSWORD_HASH_RESULT_TIMEOUT):
+        self.method = method
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self.result_timeout = result_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def _executor(self, start_method=None):
+        # Created per process, so a pool is never inherited across a fork
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(start_method or _lazy_start_method())
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def start(self):
+        """
+        Create the pool and fork all its workers now. Call once at startup,
+        before the server starts any threads. Without it the pool is made on
+        first use with forkserver/spawn, which is safe from a threaded
+        process but costs a fresh interpreter per worker.
+        """
+        if not self.workers:
+            return
+        fork = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+        # fork-context pools launch every worker on their first job
+        self._executor(fork).submit(os.getpid).result()
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy("Password hashing is overloaded, try again shortly")
+        try:
+            future = self._executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.result_timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise PasswordHasherBusy("Password hashing timed out, try again shortly")
+
+    def hash(self, password):
+        """Hash `password` with the configured method"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        """Check `password` against a stored werkzeug hash"""
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when the stored hash was made with a different method or cost"""
+        return password_hash.split("$", 1)[0] != self.method
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+password_hasher = PasswordHasher()
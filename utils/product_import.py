@@ -0,0 +1,208 @@
+# utils/product_import.py
+import csv
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import insert, select
+from db import db
+from models.products import Product
+from models.product_facets import ProductFacet, product_facet_values
+from utils.id_allocator import product_id_allocator
+from utils.product_search import index_products, search_document
+
+REQUIRED_FIELDS = ("title", "category", "price")
+DECIMAL_FIELDS = ("price", "discount", "discounted_price", "tax", "shipping_cost", "shipping_weight")
+LIST_FIELDS = ("features", "material", "size", "image_filename")
+TEXT_FIELDS = ("description", "print_quality", "finish", "care_instructions")
+
+# Stop keeping row errors after this many so a bad file cannot exhaust memory
+MAX_REPORTED_ERRORS = 1000
+
+
+class RowError(ValueError):
+    """A single import row failed validation"""
+
+
+def _parse_list(value):
+    """Accept JSON arrays, comma separated strings or lists"""
+    if value in (None, ""):
+        return None
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+            if isinstance(parsed, list):
+                return parsed
+        except ValueError:
+            pass
+        return [part.strip() for part in value.split(",") if part.strip()]
+    raise RowError(f"expected a list, got {type(value).__name__}")
+
+
+def validate_row(raw, default_seller_id, default_seller_name):
+    """Turn one CSV/JSONL record into a products row dict or raise RowError"""
+    for field in REQUIRED_FIELDS:
+        if raw.get(field) in (None, ""):
+            raise RowError(f"{field} is required")
+
+    row = {
+        "seller_id": int(raw.get("seller_id") or default_seller_id),
+        "seller_name": str(raw.get("seller_name") or default_seller_name),
+        "title": str(raw["title"]).strip()[:200],
+        "category": str(raw["category"]).strip()[:100],
+        "stock": 0,
+        "created_at": datetime.utcnow(),
+    }
+
+    for field in DECIMAL_FIELDS:
+        value = raw.get(field)
+        if value in (None, ""):
+            row[field] = None
+            continue
+        try:
+            row[field] = Decimal(str(value))
+        except InvalidOperation:
+            raise RowError(f"{field} must be a number")
+        if row[field] < 0:
+            raise RowError(f"{field} cannot be negative")
+
+    if raw.get("stock") not in (None, ""):
+        try:
+            row["stock"] = int(raw["stock"])
+        except (TypeError, ValueError):
+            raise RowError("stock must be an integer")
+        if row["stock"] < 0:
+            raise RowError("stock must be >= 0")
+
+    for field in LIST_FIELDS:
+        row[field] = _parse_list(raw.get(field))
+    if row["image_filename"] is None:
+        row["image_filename"] = []
+
+    for field in TEXT_FIELDS:
+        row[field] = raw.get(field) or None
+
+    return row
+
+
+def iter_records(stream, file_format):
+    """Yield (record, error) pairs from a text stream without reading it all; (None, None) marks a blank line"""
+    if file_format == "csv":
+        for record in csv.DictReader(stream):
+            yield record, None
+    elif file_format == "jsonl":
+        for line in stream:
+            line = line.strip()
+            if not line:
+                yield None, None
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield None, "each line must be a JSON object"
+                continue
+            yield record, None
+    else:
+        raise ValueError(f"Unsupported import format: {file_format}")
+
+
+class ProductImporter:
+    """
+    Streams a CSV or JSONL catalog into the products table
+
+    Rows are validated one at a time and written in batches: one block of
+    product_ids, one executemany INSERT and one commit per batch. Memory use
+    depends on the batch size, not on the file size.
+
+    The bulk INSERT bypasses the ORM, so the per-product listeners do not run.
+    Each batch updates the facet table and the search index itself.
+    """
+
+    def __init__(self, seller_id, seller_name, batch_size=500, progress=None):
+        self.seller_id = seller_id
+        self.seller_name = seller_name
+        self.batch_size = batch_size
+        self.progress = progress
+        self.processed = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        self.unreadable_from_row = None
+
+    def run(self, stream, file_format):
+        batch = []
+        row_number = 0
+        try:
+            for row_number, (record, parse_error) in enumerate(iter_records(stream, file_format), start=1):
+                if record is None and parse_error is None:
+                    continue  # blank line
+                self.processed += 1
+
+                try:
+                    if parse_error:
+                        raise RowError(parse_error)
+                    batch.append((row_number, validate_row(record, self.seller_id, self.seller_name)))
+                except (RowError, TypeError, ValueError) as e:
+                    self._record_error(row_number, str(e))
+
+                if len(batch) >= self.batch_size:
+                    self._flush(batch)
+                    batch = []
+        except UnicodeDecodeError as e:
+            # Decoding fails part way through the stream; earlier batches are
+            # already committed, so import what was read and stop there
+            self.unreadable_from_row = row_number + 1
+            self._record_error(self.unreadable_from_row, f"file is not valid UTF-8 from here on ({e.reason}); later rows were not read")
+
+        self._flush(batch)
+        return self.report()
+
+    def report(self):
+        return {
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "unreadable_from_row": self.unreadable_from_row
+        }
+
+    def _record_error(self, row_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "error": message})
+
+    def _flush(self, batch):
+        if not batch:
+            return
+
+        rows = [row for _, row in batch]
+        try:
+            connection = db.session.connection()
+            for row, product_id in zip(rows, product_id_allocator.reserve(connection, len(rows))):
+                row["product_id"] = product_id
+
+            db.session.execute(insert(Product.__table__), rows)
+
+            # The ORM listeners do not see Core inserts; update the derived tables for the whole batch
+            ids = dict(db.session.execute(
+                select(Product.product_id, Product.id).where(Product.product_id.in_([row["product_id"] for row in rows]))
+            ).all())
+            added = [pair for row in rows for pair in product_facet_values(row["category"], row["material"])]
+            ProductFacet.apply_changes(connection, added=added)
+            ProductFacet.refresh_price_bounds(connection)
+            index_products(connection, [(ids[row["product_id"]], search_document(row)) for row in rows])
+
+            db.session.commit()
+            self.inserted += len(rows)
+        except Exception as e:
+            db.session.rollback()
+            for row_number, _ in batch:
+                self._record_error(row_number, f"batch failed: {e}")
+
+        if self.progress:
+            self.progress(self.report())
@@ -0,0 +1,201 @@
+# utils/product_search.py
+import json
+import re
+from collections.abc import Mapping
+from sqlalchemy import text
+
+# Columns copied into the search index, in FTS5 column order
+SEARCH_FIELDS = ("title", "description", "category", "features", "material")
+
+# bm25 column weights for FTS5 (same order as SEARCH_FIELDS)
+FTS5_WEIGHTS = "10.0, 1.0, 5.0, 2.0, 2.0"
+
+# Deep OFFSET scans get slower with every page, so ranked results stop here
+MAX_SEARCH_RESULTS = 1000
+
+
+def _flatten(value):
+    """Turn JSON column values (lists, dicts, JSON strings) into plain searchable text"""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return value
+        if isinstance(parsed, str):
+            return parsed
+        value = parsed
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        return " ".join(_flatten(item) for item in value)
+    return str(value)
+
+
+def search_document(product):
+    """Field -> text mapping for anything exposing the SEARCH_FIELDS attributes or keys"""
+    if isinstance(product, Mapping):
+        return {field: _flatten(product.get(field)) for field in SEARCH_FIELDS}
+    return {field: _flatten(getattr(product, field)) for field in SEARCH_FIELDS}
+
+
+def _backend(connection):
+    return connection.dialect.name
+
+
+def ensure_search_index(engine):
+    """Create the dialect specific index structures; safe to call on every start"""
+    with engine.begin() as connection:
+        if _backend(connection) == "sqlite":
+            connection.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+                "title, description, category, features, material, "
+                "tokenize='unicode61 remove_diacritics 2')"
+            ))
+        elif _backend(connection) == "postgresql":
+            connection.execute(text(
+                "CREATE TABLE IF NOT EXISTS product_search ("
+                "product_id INTEGER PRIMARY KEY REFERENCES products(id) ON DELETE CASCADE, "
+                "document TSVECTOR NOT NULL)"
+            ))
+            connection.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_product_search_document "
+                "ON product_search USING GIN (document)"
+            ))
+
+
+def drop_search_index(engine):
+    """
+    Drop the index structures; they live outside db.metadata, so run this
+    before drop_all() (product_search references products on PostgreSQL)
+    """
+    with engine.begin() as connection:
+        if _backend(connection) == "sqlite":
+            connection.execute(text("DROP TABLE IF EXISTS products_fts"))
+        elif _backend(connection) == "postgresql":
+            connection.execute(text("DROP TABLE IF EXISTS product_search"))
+
+
+def index_products(connection, documents):
+    """
+    Insert or replace index entries
+
+    Args:
+        connection: Connection of the transaction writing the products
+        documents: list of (products.id, search_document(...)) tuples
+    """
+    if not documents:
+        return
+
+    rows = [dict(document, product_pk=product_pk) for product_pk, document in documents]
+    backend = _backend(connection)
+
+    if backend == "sqlite":
+        connection.execute(
+            text("DELETE FROM products_fts WHERE rowid = :product_pk"),
+            [{"product_pk": row["product_pk"]} for row in rows]
+        )
+        connection.execute(
+            text("INSERT INTO products_fts (rowid, title, description, category, features, material) "
+                 "VALUES (:product_pk, :title, :description, :category, :features, :material)"),
+            rows
+        )
+    elif backend == "postgresql":
+        connection.execute(
+            text("INSERT INTO product_search (product_id, document) VALUES (:product_pk, "
+                 "setweight(to_tsvector('english', :title), 'A') || "
+                 "setweight(to_tsvector('english', :category), 'B') || "
+                 "setweight(to_tsvector('english', :features || ' ' || :material), 'C') || "
+                 "setweight(to_tsvector('english', :description), 'D')) "
+                 "ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document"),
+            rows
+        )
+
+
+def remove_products(connection, product_pks):
+    """Drop index entries for deleted products"""
+    if not product_pks:
+        return
+
+    params = [{"product_pk": product_pk} for product_pk in product_pks]
+    backend = _backend(connection)
+
+    if backend == "sqlite":
+        connection.execute(text("DELETE FROM products_fts WHERE rowid = :product_pk"), params)
+    elif backend == "postgresql":
+        connection.execute(text("DELETE FROM product_search WHERE product_id = :product_pk"), params)
+
+
+def _fts5_query(query_text):
+    """Quote every term so user input can never be parsed as FTS5 syntax; prefix-match each term"""
+    terms = re.findall(r"\w+", query_text)
+    return " ".join('"{}"*'.format(term) for term in terms)
+
+
+def search_products(connection, query_text, limit, offset=0):
+    """
+    Run a ranked search
+
+    Returns:
+        list: public product_ids, best match first
+    """
+    backend = _backend(connection)
+    params = {"limit": limit, "offset": offset}
+
+    if backend == "sqlite":
+        match = _fts5_query(query_text)
+        if not match:
+            return []
+        params["q"] = match
+        sql = (
+            "SELECT p.product_id FROM products_fts "
+            "JOIN products p ON p.id = products_fts.rowid "
+            "WHERE products_fts MATCH :q "
+            f"ORDER BY bm25(products_fts, {FTS5_WEIGHTS}), p.id "
+            "LIMIT :limit OFFSET :offset"
+        )
+    elif backend == "postgresql":
+        params["q"] = query_text
+        sql = (
+            "SELECT p.product_id FROM product_search s "
+            "JOIN products p ON p.id = s.product_id, "
+            "websearch_to_tsquery('english', :q) q "
+            "WHERE s.document @@ q "
+            "ORDER BY ts_rank_cd(s.document, q) DESC, p.id "
+            "LIMIT :limit OFFSET :offset"
+        )
+    else:
+        # No full text support on this backend: unranked title match
+        params["q"] = f"%{query_text.lower()}%"
+        sql = (
+            "SELECT product_id FROM products WHERE lower(title) LIKE :q "
+            "ORDER BY id LIMIT :limit OFFSET :offset"
+        )
+
+    return [row[0] for row in connection.execute(text(sql), params)]
+
+
+def rebuild_search_index(connection, batch_size=1000):
+    """Re-index every product in batches (backfills, repairs); returns the number indexed"""
+    backend = _backend(connection)
+    if backend == "sqlite":
+        connection.execute(text("DELETE FROM products_fts"))
+    elif backend == "postgresql":
+        connection.execute(text("DELETE FROM product_search"))
+    else:
+        return 0
+
+    last_id, total = 0, 0
+    columns = ", ".join(SEARCH_FIELDS)
+    while True:
+        rows = connection.execute(
+            text(f"SELECT id, {columns} FROM products WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": batch_size}
+        ).mappings().all()
+        if not rows:
+            return total
+
+        index_products(connection, [(row["id"], search_document(row)) for row in rows])
+        last_id = rows[-1]["id"]
+        total += len(rows)
@@ -0,0 +1,127 @@
+# utils/static_assets.py
+import gzip
+import mimetypes
+import os
+import re
+from flask import Flask, request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # optional, only .gz siblings are produced without it
+    brotli = None
+
+STATIC_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+# Angular build output (main-HR5ISA23.js, media/primeicons-4GST5W3O.woff2)
+# and image variants (Screenshot_410-card-9445dc4beb61.webp)
+HASHED_ASSET = re.compile(
+    r"(?:-[A-Z0-9]{8}\.(?:js|mjs|css|map|woff2?|ttf|eot|svg)"
+    r"|/variants/[^/]+-[0-9a-f]{12}\.(?:webp|jpg))$"
+)
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+COMPRESSIBLE_EXTENSIONS = (".js", ".mjs", ".css", ".map", ".html", ".svg", ".json", ".txt", ".ttf", ".eot", ".ico")
+MIN_COMPRESS_SIZE = 1024
+
+# Preferred order when the client accepts several; the value is the sibling suffix
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def is_hashed(path):
+    """True for content-hashed file names, which never change once published"""
+    return HASHED_ASSET.search("/" + path.replace(os.sep, "/")) is not None
+
+
+def _write_atomic(target, data):
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp, target)
+
+
+def precompress(root, skip_dirs=("uploads",)):
+    """
+    Write .br (when brotli is installed) and .gz siblings for every
+    compressible file under `root` that is missing or older than its source
+
+    Returns:
+        int: number of files written
+    """
+    written = 0
+    for directory, dirnames, filenames in os.walk(root):
+        if directory == root:
+            dirnames[:] = [name for name in dirnames if name not in skip_dirs]
+
+        for name in filenames:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            source = os.path.join(directory, name)
+            stat = os.stat(source)
+            if stat.st_size < MIN_COMPRESS_SIZE:
+                continue
+
+            data = None
+            for encoding, suffix in ENCODINGS:
+                if encoding == "br" and brotli is None:
+                    continue
+                target = source + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= stat.st_mtime:
+                    continue
+                if data is None:
+                    with open(source, "rb") as handle:
+                        data = handle.read()
+                if encoding == "br":
+                    _write_atomic(target, brotli.compress(data, quality=11))
+                else:
+                    _write_atomic(target, gzip.compress(data, compresslevel=9, mtime=0))
+                written += 1
+    return written
+
+
+def _pick_encoding(root, path):
+    """Return (encoding, sibling path) for the best precompressed file the client accepts"""
+    source = safe_join(root, path)
+    if source is None or not os.path.isfile(source):
+        return None, path
+
+    for encoding, suffix in ENCODINGS:
+        if not request.accept_encodings[encoding]:
+            continue
+        sibling = source + suffix
+        if os.path.isfile(sibling) and os.path.getmtime(sibling) >= os.path.getmtime(source):
+            return encoding, path + suffix
+    return None, path
+
+
+def serve_static(root, path):
+    """
+    send_from_directory with caching suited to the file
+
+    Hashed assets are cacheable for a year and marked immutable, everything
+    else (index.html, uploads without a hash) must be revalidated against its
+    ETag. Precompressed siblings are served when Accept-Encoding allows.
+    """
+    encoding, served_path = _pick_encoding(root, path)
+    mimetype = (mimetypes.guess_type(path)[0] or "application/octet-stream") if encoding else None
+
+    response = send_from_directory(root, served_path, mimetype=mimetype)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if os.path.splitext(path)[1] in COMPRESSIBLE_EXTENSIONS:
+        response.vary.add("Accept-Encoding")
+
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE if is_hashed(path) else REVALIDATE_CACHE
+    response.headers.pop("Expires", None)
+    return response
+
+
+class PrecompressedFlask(Flask):
+    """Flask app whose /static/<path> view goes through serve_static"""
+
+    def send_static_file(self, filename):
+        if not self.has_static_folder:
+            raise RuntimeError("'static_folder' must be set to serve static_files.")
+        return serve_static(self.static_folder, filename)
@@ -0,0 +1,17 @@
+# utils/wishlist_cache.py
+import os
+from utils.ttl_cache import TTLCache
+
+# frozenset of wishlisted product_ids keyed by users.id, one cache per worker
+# process. add_to_wishlist/remove_from_wishlist drop the user's entry; the
+# TTL bounds staleness for writes made by other processes.
+wishlist_ids_cache = TTLCache(
+    maxsize=int(os.environ.get("WISHLIST_IDS_CACHE_SIZE", "10000")),
+    ttl=int(os.environ.get("WISHLIST_IDS_CACHE_TTL", "300"))
+)
+
+
+def invalidate_wishlist(user_id):
+    """Drop a user's wishlist membership set from this worker's cache"""
+    if user_id:
+        wishlist_ids_cache.delete(user_id)